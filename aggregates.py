@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+import kernels
+
+# Match-level columns: constant across every delivery of a match
+MATCH_COLUMNS = ['match_id', 'season', 'start_date', 'date', 'team1', 'team2', 'toss_winner', 'toss_decision',
+                 'winner', 'win_by_runs', 'win_by_wickets', 'dl_applied', 'player_of_match', 'venue', 'city']
+TABLES = ['batter_innings', 'bowler_innings', 'team_innings', 'matches', 'team_results']
+
+
+def _widen(table):
+    # Grouped sums of int8 columns can stay int8; give every counter room to grow
+    for col in table.columns:
+        if pd.api.types.is_integer_dtype(table[col]):
+            table[col] = table[col].astype('int64')
+    return table
+
+
+def build_batter_innings(df):
+    """One row per (match, striker): runs, balls, boundaries and wickets while on strike."""
+    # `dismissals` counts wickets that fell on a ball the striker faced (includes the non-striker being run out)
+    return _widen(kernels.batting_counts(df, ['match_id', 'striker', 'batting_team', 'bowling_team', 'start_date']))
+
+
+def build_bowler_innings(df):
+    """One row per (match, bowler): balls bowled, runs conceded and wickets credited to the bowler."""
+    return _widen(kernels.bowling_counts(df, ['match_id', 'bowler', 'bowling_team', 'batting_team', 'start_date']))
+
+
+def build_team_innings(df):
+    """One row per (match, batting team): runs off the bat, extras and wickets lost."""
+    frame = kernels.with_indicators(df)
+    return frame.groupby(['match_id', 'batting_team', 'bowling_team'], observed=True).agg(
+        start_date=('start_date', 'first'),
+        runs_off_bat=('runs_off_bat', 'sum'),
+        extras=('extras', 'sum'),
+        balls=('runs_off_bat', 'size'),
+        wickets=('is_dismissal', 'sum'),
+    ).reset_index().pipe(_widen)
+
+
+def build_matches(df):
+    """One row per match in dataset order (newest first), with the match-level columns."""
+    columns = [c for c in MATCH_COLUMNS if c in df.columns]
+    return df.drop_duplicates('match_id')[columns].reset_index(drop=True)
+
+
+def build_team_results(matches):
+    """Two rows per match, one from each side: the opponent and whether `team` won, lost or drew."""
+    sides = pd.concat([
+        matches.assign(team=matches['team1'], opponent_team=matches['team2']),
+        matches.assign(team=matches['team2'], opponent_team=matches['team1']),
+    ]).sort_index(kind='stable')
+    sides['result'] = np.select([sides['winner'] == sides['team'], sides['winner'] == "Draw"], ["won", "drawn"], "lost")
+    columns = [c for c in ['match_id', 'start_date', 'team', 'opponent_team', 'result', 'city', 'venue'] if c in sides.columns]
+    return sides[columns].reset_index(drop=True)
+
+
+def build_tables(df):
+    """All derived tables for a ball-by-ball frame, keyed by name."""
+    df = kernels.with_indicators(df)
+    matches = build_matches(df)
+    return {
+        'batter_innings': build_batter_innings(df),
+        'bowler_innings': build_bowler_innings(df),
+        'team_innings': build_team_innings(df),
+        'matches': matches,
+        'team_results': build_team_results(matches),
+    }
+
+
+def for_year(tables, year):
+    """The derived tables restricted to matches played in `year`."""
+    return {name: table[table['start_date'].dt.year == year] for name, table in tables.items()}
@@ -0,0 +1,185 @@
+"""Read-only JSON API over the same numbers the Streamlit pages show.
+
+    python api.py [path/to/new2.csv] [--host 127.0.0.1] [--port 8000]
+
+    GET /api/version
+    GET /api/seasons                      GET /api/seasons/{year}
+    GET /api/records
+    GET /api/teams                        GET /api/teams/{team}
+    GET /api/teams/{team}/vs/{opponent}
+    GET /api/players                      GET /api/players/{player}
+
+Every response carries an ETag of the payload and dataset versions and answers `If-None-Match` with 304.
+Results come from the payloads written by `precompute.py` when present, else they are computed
+once in a worker thread; concurrent requests for the same result wait on that one computation.
+The dataset is loaded at startup: restart the server after the data changes.
+"""
+import argparse
+import asyncio
+import datetime as dt
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import uvicorn
+from starlette.applications import Starlette
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+import cache
+import data
+import stats
+import store
+
+
+def jsonable(value):
+    """`value` (a stats payload) as plain JSON types: frames become lists of row objects."""
+    if isinstance(value, pd.Series):
+        value = value.to_frame()
+    if isinstance(value, pd.DataFrame):
+        frame = value if isinstance(value.index, pd.RangeIndex) else value.reset_index()
+        return json.loads(frame.to_json(orient='records', date_format='iso'))
+    if isinstance(value, dict):
+        return {str(key): jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [jsonable(item) for item in value]
+    if isinstance(value, (pd.Timestamp, dt.date)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def encode(value):
+    return json.dumps(jsonable(value), separators=(',', ':')).encode()
+
+
+class Service:
+    """The loaded dataset plus a byte-capped cache of encoded responses, shared by every request."""
+
+    def __init__(self, data_path=data.DATA_PATH, cache_dir=data.CACHE_DIR, threads=4):
+        self.inputs = data.load_inputs(data_path, cache_dir)
+        self.version = data.content_version(data_path, cache_dir)
+        # The payload shape changes with store.PAYLOAD_VERSION even when the data doesn't
+        self.etag = f'"{store.PAYLOAD_VERSION}-{self.version}"'
+        self.payloads = store.PayloadStore(store.store_path(self.version, cache_dir))
+        self.responses = cache.ResultCache()
+        self._pending = {}
+        self._executor = ThreadPoolExecutor(threads)
+
+        self.seasons = [int(year) for year in self.inputs['tables']['matches']['start_date'].dt.year.unique()]
+        self.teams = [str(team) for team in stats.team_names(self.inputs['tables']['matches'])]
+        self.players = sorted(str(player) for player in self.inputs['indexes']['striker'].values())
+
+    def _compute(self, page, selection):
+        payload = self.payloads.get(page, selection)
+        if payload is None:
+            payload = stats.run_page(page, self.inputs, selection)
+        return encode(payload)
+
+    def _finish(self, key, future):
+        self._pending.pop(key, None)
+        if not future.cancelled() and future.exception() is None:
+            self.responses.put(key, future.result())
+
+    async def body(self, page, selection):
+        """Encoded JSON for `page` at `selection`, computing it at most once at a time."""
+        key = (page,) + tuple(selection)
+        body = self.responses.get(key)
+        if body is None:
+            if key not in self._pending:
+                future = asyncio.get_running_loop().run_in_executor(self._executor, self._compute, page, selection)
+                future.add_done_callback(lambda done: self._finish(key, done))
+                self._pending[key] = future
+            # Shielded so one client hanging up doesn't cancel the work others are waiting on
+            body = await asyncio.shield(self._pending[key])
+        return body
+
+
+def json_response(request, body):
+    service = request.app.state.service
+    headers = {'ETag': service.etag, 'Cache-Control': 'no-cache'}
+    return Response(body, media_type='application/json', headers=headers)
+
+
+def not_modified(request):
+    """A 304 response when the client already holds this payload and dataset version, else None."""
+    service = request.app.state.service
+    # If-None-Match compares weakly: a W/ prefix (added by proxies and some clients) doesn't matter
+    tags = [tag.strip().removeprefix('W/') for tag in request.headers.get('if-none-match', '').split(',')]
+    if service.etag in tags or '*' in tags:
+        return Response(status_code=304, headers={'ETag': service.etag})
+    return None
+
+
+def require(value, known, what):
+    if value not in known:
+        raise HTTPException(404, f"unknown {what}: {value}")
+
+
+def report_endpoint(page, selection, checks=()):
+    """A handler serving `page` for the path parameters named in `selection`."""
+    async def endpoint(request):
+        service = request.app.state.service
+        values = [request.path_params[name] for name in selection]
+        for name, known in checks:
+            require(request.path_params[name], getattr(service, known), name)
+        return not_modified(request) or json_response(request, await service.body(page, values))
+    return endpoint
+
+
+def listing_endpoint(attribute):
+    async def endpoint(request):
+        service = request.app.state.service
+        return not_modified(request) or json_response(request, encode(getattr(service, attribute)))
+    return endpoint
+
+
+async def version(request):
+    service = request.app.state.service
+    return json_response(request, encode({'version': service.version}))
+
+
+routes = [
+    Route('/api/version', version),
+    Route('/api/seasons', listing_endpoint('seasons')),
+    Route('/api/seasons/{year:int}', report_endpoint('year_wise', ['year'], [('year', 'seasons')])),
+    Route('/api/records', report_endpoint('all_time', [])),
+    Route('/api/teams', listing_endpoint('teams')),
+    Route('/api/teams/{team}', report_endpoint('team_wise', ['team'], [('team', 'teams')])),
+    Route('/api/teams/{team}/vs/{opponent}', report_endpoint('team_wise_opponent', ['team', 'opponent'],
+                                                             [('team', 'teams'), ('opponent', 'teams')])),
+    Route('/api/players', listing_endpoint('players')),
+    Route('/api/players/{player}', report_endpoint('player_wise', ['player'], [('player', 'players')])),
+]
+
+
+async def http_error(request, exc):
+    return JSONResponse({'error': exc.detail}, status_code=exc.status_code)
+
+
+def create_app(service):
+    app = Starlette(routes=routes, exception_handlers={HTTPException: http_error})
+    app.state.service = service
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('data_path', nargs='?', default=data.DATA_PATH)
+    parser.add_argument('--cache-dir', default=data.CACHE_DIR)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--threads', type=int, default=4, help="worker threads for uncached computations")
+    args = parser.parse_args()
+    service = Service(args.data_path, args.cache_dir, args.threads)
+    uvicorn.run(create_app(service), host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+"""Times data loading and every page's computation, with peak memory, on real or synthetic data.
+
+    python bench.py [path/to/new2.csv] [--repeat N]
+    python bench.py --synthetic 10 [--repeat N]
+
+Also sizes the row indexes against full scans, and compares the old lambda/apply aggregations
+against `kernels` and the derived tables.
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+import data
+import headtohead
+import indexes
+import kernels
+import rollups
+import stats
+import synthetic
+
+
+def peak_rss():
+    # Peak resident memory in MB, or None where the Unix-only `resource` module is missing
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def peak_memory(fn):
+    """Peak bytes allocated while running `fn` once.
+
+    Counts Python, numpy and pandas allocations; Arrow's own buffers (parquet reads) are invisible
+    to tracemalloc, which is why `main` also prints the process's peak RSS.
+    """
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def report(name, fn, repeat):
+    seconds = best_of(fn, repeat)
+    print(f"{name:<28}{seconds:>12.4f}{peak_memory(fn) / 1e6:>14.1f}")
+
+
+def year_wise_legacy(year_data):
+    keys = [year_data['start_date'].dt.year, 'striker']
+    return year_data.groupby(keys, observed=True).agg(
+        total_runs=('runs_off_bat', 'sum'),
+        balls_faced=('striker', 'count'),
+        # Extras are 0-filled int8 now, so 'count' would count every ball; count the non-zero ones
+        num_wides=('wides', lambda x: (x > 0).sum()),
+        num_no_balls=('noballs', lambda x: (x > 0).sum()),
+        fours=('runs_off_bat', lambda x: (x == 4).sum()),
+        sixes=('runs_off_bat', lambda x: (x == 6).sum()),
+    ).reset_index()
+
+
+def year_wise_kernel(year_data):
+    return kernels.batting_counts(year_data, [year_data['start_date'].dt.year, 'striker'])
+
+
+def all_time_legacy(df):
+    return df.groupby(['striker'], observed=True).agg(
+        total_runs=('runs_off_bat', 'sum'),
+        balls_faced=('striker', 'count'),
+        wides_faced=('wides', lambda x: (x > 0).sum()),
+        num_outs=('player_dismissed', lambda x: (~x.isna()).sum()),
+        fours=('runs_off_bat', lambda x: (x == 4).sum()),
+        sixes=('runs_off_bat', lambda x: (x == 6).sum()),
+    ).reset_index()
+
+
+def all_time_kernel(df):
+    return kernels.batting_counts(df, ['striker'])
+
+
+def team_results_legacy(df):
+    team = df['batting_team'].iloc[0]
+    opponent = df.apply(lambda row: row['team2'] if row['team1'] == team else row['team1'], axis=1)
+    result = df.apply(lambda row: "won" if row['winner'] == team else "drawn" if row['winner'] == "Draw" else "lost", axis=1)
+    return opponent, result
+
+
+def team_results_precomputed(tables):
+    results = tables['team_results']
+    return results[results['team'] == results['team'].iloc[0]]
+
+
+def team_legacy(results):
+    return results.groupby('opponent_team').agg(
+        matches=('opponent_team', 'count'),
+        wins=('our_team_won', lambda x: (x == "won").sum()),
+        lost=('our_team_won', lambda x: (x == "lost").sum()),
+        drawn=('our_team_won', lambda x: (x == "drawn").sum()),
+    ).reset_index()
+
+
+def team_kernel(results):
+    return kernels.result_counts(results, 'opponent_team', result='our_team_won')
+
+
+def player_legacy(batting_data):
+    year = batting_data['start_date'].dt.year
+    strike_rate = batting_data.groupby(year).apply(lambda x: (x['runs_off_bat'].sum() / x.shape[0]) * 100)
+    average = batting_data.groupby(year).apply(lambda x: x['runs_off_bat'].sum() / len(x['player_dismissed'].unique()))
+    return strike_rate, average
+
+
+def player_kernel(batting_data):
+    year = batting_data['start_date'].dt.year
+    yearly = kernels.batting_counts(batting_data, [year])
+    dismissed = batting_data.groupby(year)['player_dismissed'].nunique(dropna=False).to_numpy()
+    return yearly['runs'] / yearly['balls'] * 100, yearly['runs'] / dismissed
+
+
+def bench_load(data_path, cache_dir, repeat):
+    print(f"{'load':<28}{'time (s)':>12}{'peak (MB)':>14}")
+    report('parse CSV', lambda: data.parse_csv(data_path), 1)
+    report('build parquet cache', lambda: data.build_cache(data_path, cache_dir), 1)
+    report('load deliveries (cached)', lambda: data.prepare_deliveries(data_path, cache_dir), repeat)
+    report('load tables (cached)', lambda: data.load_tables(data_path, cache_dir), repeat)
+
+
+def bench_pages(df, tables, repeat):
+    latest_year = df['start_date'].dt.year.max()
+    top_player = df.groupby('striker', observed=True)['runs_off_bat'].sum().idxmax()
+    team, opponent = tables['team_results'][['team', 'opponent_team']].iloc[0]
+    workers = os.cpu_count()
+    cube = headtohead.ResultCube(tables['team_results'])
+    rollup = rollups.PlayerRollup(df)
+    last_seasons = tables['matches']['start_date'].max() - pd.DateOffset(years=3)
+    cases = {
+        f'Year Wise ({latest_year})': lambda: stats.season_summary(df, tables, latest_year),
+        'All Time Records': lambda: stats.all_time_records(tables),
+        'All Time from deliveries': lambda: stats.records_from_summary(stats.summarize_deliveries(df)),
+        f'  ... map/reduce x{workers}': lambda: stats.parallel_all_time_records(df, workers),
+        'Team Wise': lambda: stats.team_report(tables, team),
+        'Team Wise opponent': lambda: stats.opponent_report(tables, team, opponent),
+        '  ... cube build': lambda: headtohead.ResultCube(tables['team_results']),
+        '  ... cube slices': lambda: (cube.by_opponent(team), cube.by_city(team, opponent)),
+        '  ... cube, last 3 years': lambda: (cube.by_opponent(team, last_seasons), cube.by_city(team, opponent, last_seasons)),
+        'Player Wise': lambda: stats.player_report(df, top_player),
+        '  ... rollup build': lambda: rollups.PlayerRollup(df),
+        '  ... from rollup': lambda: stats.player_report(df, top_player, rollup=rollup),
+    }
+    print(f"{'page':<28}{'time (s)':>12}{'peak (MB)':>14}")
+    for page, fn in cases.items():
+        report(page, fn, repeat)
+
+
+def bench_indexes(df, tables, repeat):
+    top_player = df.groupby('striker', observed=True)['runs_off_bat'].sum().idxmax()
+    row_indexes = indexes.build_indexes(df)
+    print(f"{'index':<28}{'build (s)':>12}{'size (MB)':>14}")
+    for col, index in row_indexes.items():
+        build = best_of(lambda: indexes.RowIndex(df[col]), repeat)
+        print(f"{col:<28}{build:>12.4f}{index.nbytes / 1e6:>14.2f}")
+    total = sum(index.nbytes for index in row_indexes.values())
+    print(f"{'all indexes':<28}{'':>12}{total / 1e6:>14.2f}  "
+          f"({total / df.memory_usage(deep=True).sum():.1%} of the deliveries frame)")
+    cases = {
+        'striker rows': (lambda: df[df['striker'] == top_player],
+                         lambda: indexes.take(df, row_indexes['striker'], top_player)),
+        'player picker': (lambda: df['striker'].unique(),
+                          lambda: row_indexes['striker'].values()),
+        'team picker (matches)': (lambda: df['batting_team'].unique(),
+                                  lambda: stats.team_names(tables['matches'])),
+    }
+    print(f"{'lookup':<28}{'scan (s)':>12}{'index (s)':>12}{'speedup':>10}")
+    for name, (scan, lookup) in cases.items():
+        before = best_of(scan, repeat)
+        after = best_of(lookup, repeat)
+        print(f"{name:<28}{before:>12.5f}{after:>12.5f}{before / after:>9.1f}x")
+
+
+def bench_kernels(df, tables, repeat):
+    latest_year = df['start_date'].dt.year.max()
+    top_player = df.groupby('striker', observed=True)['runs_off_bat'].sum().idxmax()
+    results = tables['team_results'].rename(columns={'result': 'our_team_won'})
+    cases = {
+        'Year Wise': (year_wise_legacy, year_wise_kernel, df[df['start_date'].dt.year == latest_year]),
+        'All Time Records': (all_time_legacy, all_time_kernel, df),
+        'Team Wise': (team_legacy, team_kernel, results),
+        'Team Wise results': (team_results_legacy, team_results_precomputed, (df, tables)),
+        'Player Wise': (player_legacy, player_kernel, df[df['striker'] == top_player]),
+    }
+    print(f"{'kernel':<28}{'before (s)':>12}{'after (s)':>12}{'speedup':>10}")
+    for page, (legacy, kernel, frame) in cases.items():
+        legacy_input, kernel_input = frame if isinstance(frame, tuple) else (frame, frame)
+        before = best_of(lambda: legacy(legacy_input), repeat)
+        after = best_of(lambda: kernel(kernel_input), repeat)
+        print(f"{page:<28}{before:>12.4f}{after:>12.4f}{before / after:>9.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('data_path', nargs='?', default=data.DATA_PATH)
+    parser.add_argument('--synthetic', type=int, metavar='SCALE',
+                        help="benchmark a generated dataset of SCALE 16-season leagues instead of data_path")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--skip-kernels', action='store_true', help="skip the old-vs-new aggregation comparison")
+    args = parser.parse_args()
+
+    # Work in a scratch directory so the parquet cache is built cold and the real one is untouched
+    with tempfile.TemporaryDirectory() as workdir:
+        data_path = args.data_path
+        if args.synthetic:
+            data_path = os.path.join(workdir, 'new2.csv')
+            start = time.perf_counter()
+            synthetic.generate(args.synthetic).to_csv(data_path, index=False)
+            print(f"generated {args.synthetic}x synthetic data in {time.perf_counter() - start:.1f}s")
+        cache_dir = os.path.join(workdir, 'cache')
+
+        bench_load(data_path, cache_dir, args.repeat)
+        df = data.prepare_deliveries(data_path, cache_dir)
+        tables = data.load_tables(data_path, cache_dir)
+        frame_bytes = df.memory_usage(deep=True).sum()
+        print(f"\n{len(df)} deliveries, {len(tables['matches'])} matches, best of {args.repeat}")
+        print(f"deliveries frame {frame_bytes / 1e6:.1f} MB ({frame_bytes / len(df):.0f} bytes per delivery)")
+        bench_pages(df, tables, args.repeat)
+        print()
+        bench_indexes(df, tables, args.repeat)
+        if not args.skip_kernels:
+            print()
+            bench_kernels(df, tables, args.repeat)
+    peak = peak_rss()
+    if peak is not None:
+        print(f"\npeak RSS {peak:.0f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+import functools
+import inspect
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import streamlit as st
+
+import store
+
+# Total size of cached page results across all sessions
+MAX_BYTES = 256 * 1024 * 1024
+
+
+def estimate_size(value):
+    """Approximate in-memory size of a cached result in bytes."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(value, pd.DataFrame) else int(usage)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """Thread-safe LRU mapping from key to result, evicting oldest entries past `max_bytes`."""
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+
+    def put(self, key, value):
+        nbytes = estimate_size(value)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.size -= self._entries.pop(key)[1]
+            self._entries[key] = (value, nbytes)
+            self.size += nbytes
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+@st.cache_resource
+def shared_cache():
+    """The process-wide result cache, shared by every Streamlit session."""
+    return ResultCache()
+
+
+_MISSING = object()
+
+
+def _precomputed(page, arguments):
+    """The payload `precompute.py` stored for this call, or `_MISSING`."""
+    if 'version' not in arguments:
+        return _MISSING
+    selection = [value for name, value in arguments.items() if not name.startswith('_') and name != 'version']
+    value = store.PayloadStore(store.store_path(arguments['version'])).get(page, selection)
+    return _MISSING if value is None else value
+
+
+def memoize(page):
+    """Cache a page computation on (page, arguments), skipping arguments whose name starts with `_`.
+
+    Pass the dataset version (see `data.dataset_version`) as an argument so results never
+    outlive the data they were computed from. Cached results are shared: don't mutate them.
+    On a miss, payloads written by `precompute.py` for that version are used before computing.
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (page,) + tuple((name, value) for name, value in bound.arguments.items() if not name.startswith('_'))
+            results = shared_cache()
+            value = results.get(key, _MISSING)
+            if value is _MISSING:
+                value = _precomputed(page, bound.arguments)
+                if value is _MISSING:
+                    value = fn(*args, **kwargs)
+                # Stored payloads are kept too, so reruns don't reopen and unpickle them
+                results.put(key, value)
+            return value
+
+        return wrapper
+    return decorator
@@ -0,0 +1,431 @@
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import aggregates
+import headtohead
+import indexes
+import kernels
+import rollups
+
+# Bump when the cached layout changes so stale caches get rebuilt
+SCHEMA_VERSION = 3
+DATA_PATH = './new2.csv'
+CACHE_DIR = './.cache'
+# Rows per read when streaming the CSV (see `iter_match_chunks`)
+CHUNK_ROWS = 200_000
+
+# Columns that share one set of categories, so e.g. `winner == team1` compares codes directly
+TEAM_COLUMNS = ['batting_team', 'bowling_team', 'team1', 'team2', 'toss_winner', 'winner', 'team', 'opponent_team']
+PLAYER_COLUMNS = ['striker', 'non_striker', 'bowler', 'player_dismissed', 'player_of_match']
+CATEGORY_COLUMNS = ['venue', 'city', 'wicket_type', 'toss_decision', 'season', 'date']
+INT_COLUMNS = {
+    'match_id': 'int32',
+    'innings': 'int8',
+    'runs_off_bat': 'int8',
+    'extras': 'int8',
+    'runs': 'int8',
+    'over': 'int8',
+    'ball_num': 'int8',
+    'dl_applied': 'int8',
+    'win_by_runs': 'int16',
+    'win_by_wickets': 'int8',
+}
+# Extras per delivery, empty in the CSV when there were none: held as int8 with 0 for none
+# (a nullable Int8 would carry a second byte per row for its mask)
+EXTRA_COLUMNS = ['wides', 'noballs', 'byes', 'legbyes', 'penalty']
+
+
+def _shared_category(df, columns):
+    columns = [c for c in columns if c in df.columns]
+    values = set()
+    for col in columns:
+        if not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(str).where(df[col].notna()).astype('category')
+        values.update(df[col].cat.categories)
+    categories = sorted(values)
+    for col in columns:
+        df[col] = df[col].cat.set_categories(categories)
+
+
+def apply_categories(df):
+    """Give team and player columns one shared set of categories each (in place)."""
+    _shared_category(df, TEAM_COLUMNS)
+    _shared_category(df, PLAYER_COLUMNS)
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            _shared_category(df, [col])
+    return df
+
+
+def apply_schema(df):
+    """Cast a raw ball-by-ball frame to the compact typed schema (in place)."""
+    apply_categories(df)
+    for col, dtype in INT_COLUMNS.items():
+        if col in df.columns:
+            df[col] = df[col].astype(dtype if df[col].notna().all() else dtype.capitalize())
+    for col in EXTRA_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].fillna(0).astype('int8')
+    if 'start_date' not in df.columns or not pd.api.types.is_datetime64_any_dtype(df['start_date']):
+        # Parse each distinct date string once and gather by category code
+        dates = pd.to_datetime(df['date'].cat.categories, dayfirst=True)
+        df['start_date'] = dates.take(df['date'].cat.codes.to_numpy())
+    return df
+
+
+def iter_match_chunks(data_path, chunksize=CHUNK_ROWS):
+    """Read the CSV `chunksize` rows at a time, yielding typed frames that each hold whole matches.
+
+    A match cut off at the end of one read is carried into the next, so each match's deliveries
+    must be contiguous in the file (as in the ball-by-ball exports). Memory stays around one chunk.
+    """
+    pending = None
+    for chunk in pd.read_csv(data_path, chunksize=chunksize, low_memory=False):
+        chunk = apply_schema(chunk)
+        if pending is not None:
+            chunk = apply_categories(concat_frames([pending, chunk]))
+        match_ids = chunk['match_id'].to_numpy()
+        complete = match_ids != match_ids[-1]
+        pending = chunk[~complete]
+        if complete.any():
+            yield chunk[complete]
+    if pending is not None and len(pending):
+        yield pending
+
+
+def parse_csv(data_path):
+    """Read the raw CSV and apply the schema, without touching the cache."""
+    df = pd.read_csv(data_path, low_memory=False)
+    return apply_schema(df)
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _table_path(data_path, cache_dir, table):
+    name = os.path.splitext(os.path.basename(data_path))[0]
+    return os.path.join(cache_dir, f'{name}.{table}.parquet')
+
+
+def _meta_path(data_path, cache_dir):
+    name = os.path.splitext(os.path.basename(data_path))[0]
+    return os.path.join(cache_dir, f'{name}.json')
+
+
+def _source_info(data_path):
+    stat = os.stat(data_path)
+    return {'mtime': stat.st_mtime, 'size': stat.st_size}
+
+
+def cache_is_fresh(data_path, cache_dir=CACHE_DIR):
+    """True if the cache matches the CSV; mtime/size first, content hash only if those moved."""
+    meta_path = _meta_path(data_path, cache_dir)
+    tables = ['deliveries'] + aggregates.TABLES
+    if not os.path.exists(meta_path) or not all(os.path.exists(_table_path(data_path, cache_dir, t)) for t in tables):
+        return False
+    with open(meta_path) as f:
+        meta = json.load(f)
+    if meta.get('schema_version') != SCHEMA_VERSION:
+        return False
+    info = _source_info(data_path)
+    if meta['mtime'] == info['mtime'] and meta['size'] == info['size']:
+        return True
+    if meta['size'] != info['size'] or meta['sha256'] != _file_hash(data_path):
+        return False
+    # Touched but unchanged: remember the new mtime so the hash isn't recomputed next time
+    meta.update(info)
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f)
+    return True
+
+
+def _write_table(table, path):
+    table.to_parquet(path + '.tmp', index=False)
+    os.replace(path + '.tmp', path)
+
+
+def build_cache(data_path, cache_dir=CACHE_DIR):
+    """Parse the CSV once and write the typed columnar copy, its derived tables and source metadata."""
+    df = parse_csv(data_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    _write_table(df, _table_path(data_path, cache_dir, 'deliveries'))
+    for name, table in aggregates.build_tables(df).items():
+        _write_table(table, _table_path(data_path, cache_dir, name))
+    meta = dict(_source_info(data_path), sha256=_file_hash(data_path), schema_version=SCHEMA_VERSION)
+    with open(_meta_path(data_path, cache_dir), 'w') as f:
+        json.dump(meta, f)
+    return df
+
+
+def _partition_dir(data_path, cache_dir):
+    name = os.path.splitext(os.path.basename(data_path))[0]
+    return os.path.join(cache_dir, f'{name}.partitions')
+
+
+def _manifest_path(data_path, cache_dir):
+    return os.path.join(_partition_dir(data_path, cache_dir), 'manifest.json')
+
+
+def read_manifest(data_path, cache_dir=CACHE_DIR):
+    """The partition manifest ({'schema_version', 'years': {year: {...}}}), or None if not partitioned."""
+    path = _manifest_path(data_path, cache_dir)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        manifest = json.load(f)
+    return manifest if manifest.get('schema_version') == SCHEMA_VERSION else None
+
+
+def _write_manifest(data_path, cache_dir, manifest):
+    path = _manifest_path(data_path, cache_dir)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def _write_partition(data_path, cache_dir, year, deliveries):
+    """Write one season's deliveries and its derived tables; return its manifest entry."""
+    year_dir = os.path.join(_partition_dir(data_path, cache_dir), str(year))
+    os.makedirs(year_dir, exist_ok=True)
+    path = os.path.join(year_dir, 'deliveries.parquet')
+    # Newest match first, as in the CSV, wherever appended or corrected matches landed; each match's balls keep their order
+    deliveries = deliveries.sort_values(['start_date', 'match_id'], ascending=False, kind='stable').reset_index(drop=True)
+    _write_table(deliveries, path)
+    for name, table in aggregates.build_tables(deliveries).items():
+        _write_table(table, os.path.join(year_dir, f'{name}.parquet'))
+    return {'rows': len(deliveries), 'matches': int(deliveries['match_id'].nunique()), 'sha256': _file_hash(path)}
+
+
+def concat_frames(frames):
+    """`pd.concat` that keeps categorical columns categorical when each frame has its own categories."""
+    frames = [frame.copy(deep=False) for frame in frames]
+    for col in frames[0].columns:
+        if all(col in frame.columns and isinstance(frame[col].dtype, pd.CategoricalDtype) for frame in frames):
+            categories = sorted(set().union(*(frame[col].cat.categories for frame in frames)))
+            for frame in frames:
+                frame[col] = frame[col].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
+
+
+def append_partitions(data_path, new, cache_dir=CACHE_DIR, create=False):
+    """Add the deliveries in `new` to the season partitions; only the seasons they touch are rewritten.
+
+    Matches already stored are replaced by their new rows, and each rewritten season is stored
+    newest match first. Returns the years that were rewritten.
+
+    Without an existing manifest this raises ValueError unless `create` is set: partitions holding
+    only the new seasons would replace the CSV as the source and hide every other season.
+    """
+    manifest = read_manifest(data_path, cache_dir)
+    if manifest is None:
+        if not create:
+            raise ValueError(f"{data_path} has no season partitions yet; run `ingest.py init` first")
+        manifest = {'schema_version': SCHEMA_VERSION, 'years': {}}
+    new = apply_schema(new)
+    years = sorted(new['start_date'].dt.year.unique())
+    for year in years:
+        part = new[new['start_date'].dt.year == year]
+        path = os.path.join(_partition_dir(data_path, cache_dir), str(year), 'deliveries.parquet')
+        if str(year) in manifest['years'] and os.path.exists(path):
+            existing = pd.read_parquet(path)
+            existing = existing[~existing['match_id'].isin(part['match_id'].unique())]
+            part = concat_frames([part, existing])
+        manifest['years'][str(year)] = _write_partition(data_path, cache_dir, year, apply_schema(part))
+    # Written last, so readers never see a manifest pointing at half-written partitions
+    _write_manifest(data_path, cache_dir, manifest)
+    return [int(year) for year in years]
+
+
+def drop_partitions(data_path, cache_dir=CACHE_DIR):
+    """Delete the season partitions, making the CSV the source again."""
+    shutil.rmtree(_partition_dir(data_path, cache_dir), ignore_errors=True)
+
+
+def _load_partitions(data_path, cache_dir, manifest, table):
+    # Newest season first, matching the CSV's newest-first order
+    years = sorted(manifest['years'], key=int, reverse=True)
+    frames = [pd.read_parquet(os.path.join(_partition_dir(data_path, cache_dir), year, f'{table}.parquet')) for year in years]
+    return concat_frames(frames)
+
+
+def load_deliveries(data_path, cache_dir=CACHE_DIR):
+    """Ball-by-ball frame for `data_path`, served from the columnar cache when it is fresh.
+
+    Once the data has been partitioned (see `ingest.py`) the season partitions are the source
+    and the CSV itself is no longer read.
+    """
+    try:
+        manifest = read_manifest(data_path, cache_dir)
+        if manifest:
+            return apply_schema(_load_partitions(data_path, cache_dir, manifest, 'deliveries'))
+        if cache_is_fresh(data_path, cache_dir):
+            return apply_schema(pd.read_parquet(_table_path(data_path, cache_dir, 'deliveries')))
+        return build_cache(data_path, cache_dir)
+    except ImportError:
+        # No parquet engine installed: fall back to parsing the CSV every time
+        return parse_csv(data_path)
+
+
+def load_tables(data_path, cache_dir=CACHE_DIR):
+    """Derived per-innings / per-match tables (see `aggregates`) for `data_path`."""
+    try:
+        manifest = read_manifest(data_path, cache_dir)
+        if manifest:
+            tables = {name: _load_partitions(data_path, cache_dir, manifest, name) for name in aggregates.TABLES}
+        else:
+            if not cache_is_fresh(data_path, cache_dir):
+                build_cache(data_path, cache_dir)
+            tables = {name: pd.read_parquet(_table_path(data_path, cache_dir, name)) for name in aggregates.TABLES}
+    except ImportError:
+        return aggregates.build_tables(parse_csv(data_path))
+    for table in tables.values():
+        apply_categories(table)
+    return tables
+
+
+def prepare_deliveries(data_path, cache_dir=CACHE_DIR):
+    """`load_deliveries` plus the derived columns the pages expect (total_runs, indicator `flags`)."""
+    df = load_deliveries(data_path, cache_dir)
+    df['total_runs'] = df['runs_off_bat']
+    # Indicators packed one bit each; read them with `kernels.indicator`
+    return kernels.add_flags(df)
+
+
+def load_inputs(data_path, cache_dir=CACHE_DIR):
+    """Everything `stats` reads, loaded without Streamlit: {'df', 'tables', 'indexes', 'cube', 'rollup'}."""
+    df = prepare_deliveries(data_path, cache_dir)
+    tables = load_tables(data_path, cache_dir)
+    return {'df': df, 'tables': tables, 'indexes': indexes.build_indexes(df),
+            'cube': headtohead.ResultCube(tables['team_results']), 'rollup': rollups.PlayerRollup(df)}
+
+
+def year_bounds(df):
+    """{year: (start, stop)} row ranges when each season is one contiguous block of `df`, else None."""
+    years = df['start_date'].dt.year.to_numpy()
+    starts = np.flatnonzero(np.r_[True, years[1:] != years[:-1]])
+    block_years = years[starts]
+    if len(set(block_years)) != len(block_years):
+        return None
+    stops = np.r_[starts[1:], len(years)]
+    return {int(year): (int(start), int(stop)) for year, start, stop in zip(block_years, starts, stops)}
+
+
+def _source_key(data_path, cache_dir=CACHE_DIR):
+    # What the shared copies are keyed on: the partition manifest once partitioned, else the CSV
+    manifest_path = _manifest_path(data_path, cache_dir)
+    return _source_info(manifest_path if os.path.exists(manifest_path) else data_path)
+
+
+@st.cache_resource(max_entries=1)
+def _shared_deliveries(data_path, mtime, size):
+    return prepare_deliveries(data_path)
+
+
+def get_deliveries(data_path=DATA_PATH):
+    """The one in-memory ball-by-ball frame, shared by every page and every session.
+
+    Callers must treat it as read-only: filter or `.copy()` before adding columns.
+    A new copy is only loaded when the CSV (or the partition manifest) on disk changes.
+    """
+    info = _source_key(data_path)
+    return _shared_deliveries(data_path, info['mtime'], info['size'])
+
+
+@st.cache_resource(max_entries=1)
+def _shared_year_bounds(data_path, mtime, size):
+    return year_bounds(_shared_deliveries(data_path, mtime, size))
+
+
+def get_year_deliveries(year, data_path=DATA_PATH):
+    """One season of the shared frame: a slice of its block when seasons are contiguous
+    (always true for partitioned data), else a filter over every delivery."""
+    info = _source_key(data_path)
+    df = _shared_deliveries(data_path, info['mtime'], info['size'])
+    bounds = _shared_year_bounds(data_path, info['mtime'], info['size'])
+    if bounds is None:
+        return df[df['start_date'].dt.year == year]
+    start, stop = bounds.get(int(year), (0, 0))
+    return df.iloc[start:stop]
+
+
+@st.cache_resource(max_entries=1)
+def _shared_indexes(data_path, mtime, size):
+    return indexes.build_indexes(_shared_deliveries(data_path, mtime, size))
+
+
+def get_indexes(data_path=DATA_PATH):
+    """Row-position indexes (see `indexes`) over the shared deliveries frame, built once per load."""
+    info = _source_key(data_path)
+    return _shared_indexes(data_path, info['mtime'], info['size'])
+
+
+@st.cache_resource(max_entries=1)
+def _shared_tables(data_path, mtime, size):
+    return load_tables(data_path)
+
+
+def get_tables(data_path=DATA_PATH):
+    """Shared derived tables for the current CSV; read-only, like `get_deliveries`."""
+    info = _source_key(data_path)
+    return _shared_tables(data_path, info['mtime'], info['size'])
+
+
+@st.cache_resource(max_entries=1)
+def _shared_cube(data_path, mtime, size):
+    return headtohead.ResultCube(_shared_tables(data_path, mtime, size)['team_results'])
+
+
+def get_results_cube(data_path=DATA_PATH):
+    """Team × opponent × city results (see `headtohead`) over the shared tables, built once per load."""
+    info = _source_key(data_path)
+    return _shared_cube(data_path, info['mtime'], info['size'])
+
+
+@st.cache_resource(max_entries=1)
+def _shared_rollup(data_path, mtime, size):
+    return rollups.PlayerRollup(_shared_deliveries(data_path, mtime, size))
+
+
+def get_player_rollup(data_path=DATA_PATH):
+    """Per-player batting rollups (see `rollups`) over the shared deliveries frame, built once per load."""
+    info = _source_key(data_path)
+    return _shared_rollup(data_path, info['mtime'], info['size'])
+
+
+def content_version(data_path, cache_dir=CACHE_DIR):
+    """Short content hash of the CSV, taken from the cache metadata when it is current.
+
+    Partitioned data is versioned by its manifest, which holds a hash of every partition.
+    """
+    manifest = read_manifest(data_path, cache_dir)
+    if manifest:
+        return hashlib.sha256(json.dumps(manifest, sort_keys=True).encode()).hexdigest()[:16]
+    meta_path = _meta_path(data_path, cache_dir)
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get('size') == os.path.getsize(data_path):
+            return meta['sha256'][:16]
+    return _file_hash(data_path)[:16]
+
+
+@st.cache_resource(max_entries=1)
+def _version(data_path, mtime, size):
+    return content_version(data_path)
+
+
+def dataset_version(data_path=DATA_PATH):
+    """Short content hash of the data, for keying results computed from it."""
+    info = _source_key(data_path)
+    return _version(data_path, info['mtime'], info['size'])
@@ -0,0 +1,81 @@
+"""Win/loss/draw counts by team × opponent × city, built once from the `team_results` table.
+
+Each row of `team_results` (one per side of a match, keyed by match_id) is coded once to its
+opponent, city and result, and the rows are sorted by team, then date. A team's results are
+then one contiguous slice (`indexes.group_offsets`), narrowed to a date range by two
+`searchsorted` calls; the Team Wise charts are `bincount`s over that slice alone, so nothing
+proportional to teams² × cities is ever held or scanned.
+"""
+import numpy as np
+import pandas as pd
+
+import indexes
+
+RESULTS = ['won', 'lost', 'drawn']
+
+
+class ResultCube:
+    """Per-team results sorted by date; the last city code stands for matches with no city."""
+
+    def __init__(self, team_results):
+        self.teams = team_results['team'].cat.categories
+        self.cities = team_results['city'].cat.categories
+
+        team = team_results['team'].cat.codes.to_numpy()
+        opponent = team_results['opponent_team'].cat.set_categories(self.teams).cat.codes.to_numpy()
+        city = team_results['city'].cat.codes.to_numpy().copy()
+        city[city < 0] = len(self.cities)
+        result = pd.Index(RESULTS).get_indexer(team_results['result'])
+        dates = team_results['start_date'].to_numpy()
+
+        # Team first, then date (lexsort is stable, so same-day rows keep their table order)
+        order = np.lexsort((dates, team))
+        self.dates = dates[order]
+        self.opponents = opponent[order].astype(np.int32)
+        self.city_codes = city[order].astype(np.int32)
+        self.results = result[order].astype(np.int8)
+        self.offsets = indexes.group_offsets(team[order], len(self.teams))
+
+    def _rows(self, team, start=None, end=None):
+        """Slice of `team`'s rows for matches from `start` to `end` (dates, both inclusive; None is open)."""
+        code = self.teams.get_indexer([team])[0]
+        if code < 0:
+            return slice(0, 0)
+        lo, hi = self.offsets[code], self.offsets[code + 1]
+        dates = self.dates[lo:hi]
+        if start is not None:
+            lo += np.searchsorted(dates, pd.Timestamp(start).to_datetime64(), 'left')
+        if end is not None:
+            hi = self.offsets[code] + np.searchsorted(dates, pd.Timestamp(end).to_datetime64(), 'right')
+        return slice(lo, max(lo, hi))
+
+    def _frame(self, key, categories, counts):
+        # Same layout as `kernels.result_counts`: one row per key with at least one match
+        present = np.flatnonzero(counts.sum(axis=1))
+        counts = counts[present]
+        return pd.DataFrame({
+            key: pd.Categorical.from_codes(present, categories),
+            'matches': counts.sum(axis=1),
+            'wins': counts[:, 0],
+            'lost': counts[:, 1],
+            'drawn': counts[:, 2],
+        })
+
+    def by_opponent(self, team, start=None, end=None):
+        """`team`'s results against each opponent: opponent_team, matches, wins, lost, drawn."""
+        rows = self._rows(team, start, end)
+        cells = self.opponents[rows].astype(np.int64) * len(RESULTS) + self.results[rows]
+        counts = np.bincount(cells, minlength=len(self.teams) * len(RESULTS)).reshape(-1, len(RESULTS))
+        return self._frame('opponent_team', self.teams, counts)
+
+    def by_city(self, team, opponent, start=None, end=None):
+        """`team`'s results against `opponent` in each city: city, matches, wins, lost, drawn."""
+        rows = self._rows(team, start, end)
+        against = self.opponents[rows] == self.teams.get_indexer([opponent])[0]
+        cells = self.city_codes[rows][against].astype(np.int64) * len(RESULTS) + self.results[rows][against]
+        counts = np.bincount(cells, minlength=(len(self.cities) + 1) * len(RESULTS)).reshape(-1, len(RESULTS))
+        return self._frame('city', self.cities, counts[:-1])
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in [self.dates, self.opponents, self.city_codes, self.results, self.offsets])
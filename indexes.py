@@ -0,0 +1,63 @@
+"""Row-position indexes over the categorical columns of the deliveries frame.
+
+Each index stores, per category, the positions of the rows holding it (CSR layout: one int32
+array of positions grouped by value, plus offsets). A lookup is then a slice plus a `take` of
+the k matching rows instead of comparing all N rows.
+"""
+import numpy as np
+
+# Columns the pages look rows up by: the Player Wise picker lists strikers. Player reports read
+# `rollups` instead of gathering a player's rows, no page looks rows up by bowler or dismissed
+# player, and team pickers read the small matches table instead.
+INDEX_COLUMNS = ['striker']
+
+
+def group_offsets(codes, size):
+    """Start of each code's rows in rows sorted by code: rows of code c are offsets[c]:offsets[c + 1]."""
+    offsets = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(codes, minlength=size), out=offsets[1:])
+    return offsets
+
+
+class RowIndex:
+    """Positions of each value's rows in one categorical column; missing values are not indexed."""
+
+    def __init__(self, column):
+        codes = column.cat.codes.to_numpy()
+        self.categories = column.cat.categories
+        present = np.flatnonzero(codes >= 0)
+        # Stable sort keeps each value's positions in row order, so gathers preserve frame order
+        self.positions = present[np.argsort(codes[present], kind='stable')].astype(np.int32)
+        self.offsets = group_offsets(codes[present], len(self.categories))
+
+    def rows(self, value):
+        """Positions of the rows where the column equals `value`, in frame order."""
+        code = self.categories.get_indexer([value])[0]
+        if code < 0:
+            return self.positions[:0]
+        return self.positions[self.offsets[code]:self.offsets[code + 1]]
+
+    def count(self, value):
+        code = self.categories.get_indexer([value])[0]
+        return 0 if code < 0 else int(self.offsets[code + 1] - self.offsets[code])
+
+    def values(self):
+        """Values present in the column, in order of first appearance (like `Series.unique()`)."""
+        counts = np.diff(self.offsets)
+        present = np.flatnonzero(counts)
+        first_rows = self.positions[self.offsets[present]]
+        return list(self.categories[present[np.argsort(first_rows)]])
+
+    @property
+    def nbytes(self):
+        return self.positions.nbytes + self.offsets.nbytes
+
+
+def build_indexes(df, columns=INDEX_COLUMNS):
+    """A RowIndex for each of `columns` present in `df`, keyed by column name."""
+    return {col: RowIndex(df[col]) for col in columns if col in df.columns}
+
+
+def take(df, index, value):
+    """The rows of `df` where the indexed column equals `value` (same result as a boolean mask)."""
+    return df.take(index.rows(value))
@@ -0,0 +1,43 @@
+"""Splits the ball-by-ball data into season partitions and appends new matches to them.
+
+    python ingest.py init [path/to/new2.csv]
+    python ingest.py append new_matches.csv [--data-path path/to/new2.csv]
+
+After `init` the app reads the partitions instead of the CSV. `append` takes a CSV of new (or
+corrected) matches in the same schema and rewrites only the seasons it touches, along with
+their derived tables, so there is no need to regenerate and re-read the whole history.
+"""
+import argparse
+import time
+
+import data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cache-dir', default=data.CACHE_DIR)
+    commands = parser.add_subparsers(dest='command', required=True)
+    init = commands.add_parser('init', help="(re)build every season partition from the full CSV")
+    init.add_argument('data_path', nargs='?', default=data.DATA_PATH)
+    append = commands.add_parser('append', help="add the matches in a CSV to the partitions")
+    append.add_argument('new_path')
+    append.add_argument('--data-path', default=data.DATA_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == 'init':
+        data.drop_partitions(args.data_path, args.cache_dir)
+        years = data.append_partitions(args.data_path, data.parse_csv(args.data_path), args.cache_dir, create=True)
+    else:
+        try:
+            years = data.append_partitions(args.data_path, data.parse_csv(args.new_path), args.cache_dir)
+        except ValueError as exc:
+            parser.error(str(exc))
+    manifest = data.read_manifest(args.data_path, args.cache_dir)
+    rows = sum(entry['rows'] for entry in manifest['years'].values())
+    print(f"rewrote {len(years)} season(s) {years} in {time.perf_counter() - start:.1f}s; "
+          f"{len(manifest['years'])} seasons, {rows} deliveries, version {data.content_version(args.data_path, args.cache_dir)}")
+
+
+if __name__ == '__main__':
+    main()
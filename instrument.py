@@ -0,0 +1,113 @@
+"""Per-section timing for page renders: wall time, rows processed and memory deltas.
+
+Wrap work in `section(name)`. While a `run` is active (one per Streamlit rerun, started by
+`app.py` when profiling is on) each section is recorded; otherwise `section` does nothing, so
+the pure `stats` code can carry sections at no cost. Each run is appended to LOG_PATH as one JSON
+line for offline analysis, and `show_panel` lists it in the sidebar.
+"""
+import contextvars
+import functools
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+# Profile every rerun, not only sessions opened with ?debug=1
+ENABLED = os.environ.get('IPL_PROFILE') == '1'
+LOG_PATH = os.environ.get('IPL_TIMINGS_LOG', './.cache/timings.jsonl')
+
+logger = logging.getLogger('ipl.timings')
+_current = contextvars.ContextVar('instrument_run', default=None)
+
+
+def _rss():
+    # Current resident memory in bytes: /proc on Linux, psutil elsewhere if installed, else None
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, AttributeError, ValueError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+def _log_handler():
+    if not logger.handlers:
+        os.makedirs(os.path.dirname(LOG_PATH) or '.', exist_ok=True)
+        handler = logging.FileHandler(LOG_PATH)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+
+@contextmanager
+def run(page, enabled=True):
+    """Record the sections timed inside this block and log them as one JSON line at the end.
+
+    Yields the run dict ({'page', 'started', 'seconds', 'sections'}), or None when not enabled.
+    """
+    if not enabled:
+        yield None
+        return
+    timings = {'page': page, 'started': time.time(), 'seconds': None, 'sections': [], 'depth': 0}
+    token = _current.set(timings)
+    start = time.perf_counter()
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+        timings['seconds'] = round(time.perf_counter() - start, 6)
+        del timings['depth']
+        _log_handler()
+        logger.info(json.dumps(timings, default=str))
+
+
+@contextmanager
+def section(name, rows=None):
+    """Time the enclosed block; set `entry['rows']` inside it when the row count is only known there."""
+    timings = _current.get()
+    if timings is None:
+        yield {}
+        return
+    # Appended on entry so sections stay in start order, with `depth` showing nesting
+    entry = {'section': name, 'depth': timings['depth'], 'rows': rows}
+    timings['sections'].append(entry)
+    timings['depth'] += 1
+    rss = _rss()
+    start = time.perf_counter()
+    try:
+        yield entry
+    finally:
+        entry['seconds'] = round(time.perf_counter() - start, 6)
+        after = _rss()
+        # None where resident memory can't be read
+        entry['rss_delta_mb'] = None if rss is None or after is None else round((after - rss) / 1e6, 2)
+        timings['depth'] -= 1
+
+
+def timed(name):
+    """Decorator form of `section`."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with section(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def show_panel(timings):
+    """Sidebar table of one run's sections (Streamlit is imported only when this is shown)."""
+    import pandas as pd
+    import streamlit as st
+
+    with st.sidebar.expander(f"⏱ Timings: {timings['seconds'] * 1000:.0f} ms", expanded=True):
+        frame = pd.DataFrame(timings['sections'], columns=['section', 'depth', 'seconds', 'rows', 'rss_delta_mb'])
+        frame['section'] = ['  ' * depth + name for depth, name in zip(frame['depth'], frame['section'])]
+        st.dataframe(frame.drop(columns='depth').set_index('section'))
+        st.caption(f"Logged to {LOG_PATH}")
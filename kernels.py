@@ -0,0 +1,103 @@
+import numpy as np
+
+# Boolean per-delivery indicators; summing them per group replaces `lambda x: (x == 4).sum()` style aggregations
+INDICATORS = ['is_four', 'is_six', 'is_wide', 'is_noball', 'is_dismissal', 'is_bowler_wicket']
+# Bit of each indicator in the packed `flags` column (one uint8 per delivery instead of six bools)
+FLAG_BITS = {name: 1 << bit for bit, name in enumerate(INDICATORS)}
+
+
+def indicator_values(df):
+    """The INDICATORS of a ball-by-ball frame as boolean Series, computed from its raw columns."""
+    return {
+        'is_four': df['runs_off_bat'] == 4,
+        'is_six': df['runs_off_bat'] == 6,
+        'is_wide': df['wides'] > 0,
+        'is_noball': df['noballs'] > 0,
+        # A wicket fell on this ball (whoever was out)
+        'is_dismissal': df['player_dismissed'].notna(),
+        # A wicket credited to the bowler
+        'is_bowler_wicket': df['wicket_type'].notna() & (df['wicket_type'] != "run out"),
+    }
+
+
+def add_indicators(df):
+    """Add the INDICATORS columns to a ball-by-ball frame (in place)."""
+    for name, values in indicator_values(df).items():
+        df[name] = values
+    return df
+
+
+def add_flags(df):
+    """Add the INDICATORS packed into one uint8 `flags` column (in place); see `indicator`."""
+    flags = np.zeros(len(df), dtype=np.uint8)
+    for name, values in indicator_values(df).items():
+        flags |= values.to_numpy(dtype=bool) * np.uint8(FLAG_BITS[name])
+    df['flags'] = flags
+    return df
+
+
+def indicator(df, name):
+    """One indicator of `df` as a boolean Series: its column, its bit of `flags`, or computed."""
+    if name in df.columns:
+        return df[name]
+    if 'flags' in df.columns:
+        return (df['flags'] & FLAG_BITS[name]) != 0
+    return indicator_values(df)[name]
+
+
+def with_indicators(df):
+    """`df` itself if it already carries the indicators, else `df` with them added as columns.
+
+    The added columns belong to the returned frame only (copy-on-write), so a shared frame that
+    carries just `flags` is left untouched.
+    """
+    if all(col in df.columns for col in INDICATORS):
+        return df
+    if 'flags' in df.columns:
+        return df.assign(**{name: indicator(df, name) for name in INDICATORS})
+    return df.assign(**indicator_values(df))
+
+
+def _key_columns(keys):
+    # Named key columns to carry into a narrowed frame (Series keys align by index)
+    keys = [keys] if isinstance(keys, str) else keys
+    return [key for key in keys if isinstance(key, str)]
+
+
+def batting_counts(df, keys):
+    """Runs, balls, extras faced, boundaries and dismissals per group of deliveries."""
+    df = with_indicators(df)
+    return df.groupby(keys, observed=True).agg(
+        runs=('runs_off_bat', 'sum'),
+        balls=('runs_off_bat', 'size'),
+        wides=('is_wide', 'sum'),
+        noballs=('is_noball', 'sum'),
+        fours=('is_four', 'sum'),
+        sixes=('is_six', 'sum'),
+        dismissals=('is_dismissal', 'sum'),
+    ).reset_index()
+
+
+def bowling_counts(df, keys):
+    """Balls bowled, runs conceded (bat + wides + no-balls) and bowler wickets per group."""
+    df = with_indicators(df)
+    conceded = df['runs_off_bat'].to_numpy(dtype='int64') + df['wides'].fillna(0).to_numpy(dtype='int64') \
+        + df['noballs'].fillna(0).to_numpy(dtype='int64')
+    columns = _key_columns(keys) + ['runs_off_bat', 'is_bowler_wicket']
+    return df[columns].assign(conceded=conceded).groupby(keys, observed=True).agg(
+        balls=('runs_off_bat', 'size'),
+        conceded=('conceded', 'sum'),
+        wickets=('is_bowler_wicket', 'sum'),
+    ).reset_index()
+
+
+def result_counts(df, keys, result='result'):
+    """Matches, wins, losses and draws per group of a frame with a won/lost/drawn `result` column."""
+    outcome = df[result].to_numpy()
+    counted = df[_key_columns(keys)].assign(wins=outcome == "won", lost=outcome == "lost", drawn=outcome == "drawn")
+    return counted.groupby(keys, observed=True).agg(
+        matches=('wins', 'size'),
+        wins=('wins', 'sum'),
+        lost=('lost', 'sum'),
+        drawn=('drawn', 'sum'),
+    ).reset_index()
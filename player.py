@@ -1,75 +1,83 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import datetime as dt
+import plotly.express as px
+import cache
+import data
+import instrument
+import stats
+
+@cache.memoize('player_wise')
+def player_report(_df, _rollup, version, selected_player):
+    """`stats.player_report` read off the shared rollups, cached per dataset version and player."""
+    return stats.player_report(_df, selected_player, rollup=_rollup)
+
 
 def display_player_dashboard(df):
-    selected_player = st.sidebar.selectbox("Select a Player", sorted(df['striker'].unique()), key="player_selection")
+    row_indexes = data.get_indexes()
+    selected_player = st.sidebar.selectbox("Select a Player", sorted(row_indexes['striker'].values()), key="player_selection")
     """Display the player-wise dashboard"""
     st.title(f"🏏 {selected_player}'s IPL Dashboard")
-
-    # Filter data for selected player
-    batting_data = df[(df['striker'] == selected_player)].copy()
-    num_matches = len(batting_data["match_id"].unique())
-    runs_scored = sum(batting_data["runs_off_bat"])
-    balls_faced = len(batting_data)
-    num_times_out = df[df["player_dismissed"] == selected_player].shape[0]
-    batting_avg = runs_scored / num_times_out if num_times_out > 0 else "Not available"
-    strike_rate = round((runs_scored / balls_faced) * 100, 2) if balls_faced > 0 else "Not Available"
-    max_runs_single_day = batting_data.groupby(["start_date"])["runs_off_bat"].sum().max()  # Maximum runs scored in a single start_day
+    with instrument.section('player_wise report') as entry:
+        report = player_report(df, data.get_player_rollup(), data.dataset_version(), selected_player)
+        entry['rows'] = report['balls_faced']
 
     # Key Metrics
     st.header("Key Metrics")
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Number of Matches Played", num_matches)
-        st.metric("Balls Faced", balls_faced)
-        st.metric("Number of Times Out", num_times_out)
+        st.metric("Number of Matches Played", report['num_matches'])
+        st.metric("Balls Faced", report['balls_faced'])
+        st.metric("Number of Times Out", report['num_times_out'])
 
     with col2:
-        st.metric("Runs Scored", runs_scored)
-        st.metric("Strike Rate", strike_rate)
+        st.metric("Runs Scored", report['runs_scored'])
+        st.metric("Strike Rate", "Not Available" if report['strike_rate'] is None else report['strike_rate'])
+
+    with col3:
+        st.metric("Batting Average", "Not available" if report['batting_avg'] is None else round(report['batting_avg'], 2))
+        st.metric("Best Innings", report['best_innings'])
 
+    # Form over the last few innings
+    form = report['form']
+    st.header(f"Recent Form (last {form['innings']} innings)")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Runs", form['runs'])
+    with col2:
+        st.metric("Average", "Not available" if form['average'] is None else round(form['average'], 2))
     with col3:
-        st.metric("Batting Average", round(batting_avg, 2))
-        st.metric("Max Runs in Single Day", max_runs_single_day)
+        st.metric("Strike Rate", "Not Available" if form['strike_rate'] is None else form['strike_rate'])
 
     # Top 10 Scores
     st.header("Top 10 Scores")
-    st.write(batting_data.groupby(["start_date", "venue", "date", "batting_team", "bowling_team"])
-             ["runs_off_bat"].sum().nlargest(10).reset_index())
+    st.write(report['top_scores'])
 
     # Total Runs per Year
     st.header("Total Runs per Year")
-    sm = batting_data.groupby([batting_data["start_date"].dt.year, "batting_team"])["runs_off_bat"].sum().reset_index()
-    fig, ax = plt.subplots(figsize=(10, 6))
-    for team in sm['batting_team'].unique():
-        team_data = sm[sm['batting_team'] == team]
-        ax.bar(team_data['start_date'], team_data['runs_off_bat'], label=team)
-    ax.set_xlabel('Year')
-    ax.set_ylabel('Total Runs')
-    ax.set_title(f"Total Runs per Year for {selected_player}")
-    ax.legend()
-    st.pyplot(fig)
+    sm = report['yearly_runs']
+    with instrument.section('yearly runs figure', rows=len(sm)):
+        # Side by side per year for players who batted for more than one team that season
+        fig = px.bar(sm, x='start_date', y='runs_off_bat', color='batting_team', barmode='group',
+                     title=f"Total Runs per Year for {selected_player}",
+                     labels={'start_date': 'Year', 'runs_off_bat': 'Total Runs', 'batting_team': 'Team'})
+    with instrument.section('yearly runs render'):
+        st.plotly_chart(fig, use_container_width=True)
 
     # Line graph for strike rate year-wise
     st.header("Average Strike Rate per Year")
-    strike_rate_data = batting_data.groupby(batting_data["start_date"].dt.year).apply(
-        lambda x: (x["runs_off_bat"].sum() / x.shape[0]) * 100).reset_index(name="strike_rate")
-    fig, ax = plt.subplots(figsize=(10, 6))
-    ax.plot(strike_rate_data["start_date"], strike_rate_data["strike_rate"], marker='o')
-    ax.set_title(f"Average Strike Rate per Year for {selected_player}")
-    ax.set_xlabel("Year")
-    ax.set_ylabel("Strike Rate")
-    st.pyplot(fig)
+    strike_rate_data = report['strike_rate_data']
+    with instrument.section('strike rate figure', rows=len(strike_rate_data)):
+        fig = px.line(strike_rate_data, x="start_date", y="strike_rate", markers=True,
+                      title=f"Average Strike Rate per Year for {selected_player}",
+                      labels={"start_date": "Year", "strike_rate": "Strike Rate"})
+    with instrument.section('strike rate render'):
+        st.plotly_chart(fig, use_container_width=True)
 
     # Line graph for batting average year-wise
     st.header("Average Batting Average per Year")
-    batting_avg_data = batting_data.groupby(batting_data["start_date"].dt.year).apply(
-        lambda x: x["runs_off_bat"].sum() / len(x["player_dismissed"].unique())).reset_index(name="batting_avg")
-    fig, ax = plt.subplots(figsize=(10, 6))
-    ax.plot(batting_avg_data["start_date"], batting_avg_data["batting_avg"], marker='o')
-    ax.set_title(f"Average Batting Average per Year for {selected_player}")
-    ax.set_xlabel("Year")
-    ax.set_ylabel("Batting Average")
-    st.pyplot(fig)
+    batting_avg_data = report['batting_avg_data']
+    with instrument.section('batting average figure', rows=len(batting_avg_data)):
+        fig = px.line(batting_avg_data, x="start_date", y="batting_avg", markers=True,
+                      title=f"Average Batting Average per Year for {selected_player}",
+                      labels={"start_date": "Year", "batting_avg": "Batting Average"})
+    with instrument.section('batting average render'):
+        st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,67 @@
+"""Computes every page payload ahead of time and stores them on disk.
+
+    python precompute.py [path/to/new2.csv] [--workers N]
+
+The app picks the stored payloads up through `cache.memoize`, so page loads skip the pandas work.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import data
+import stats
+import store
+
+# Loaded once per worker process by `_init_worker`
+_inputs = {}
+
+
+def _init_worker(data_path, cache_dir):
+    _inputs.update(data.load_inputs(data_path, cache_dir))
+
+
+def _run(job):
+    page, selection = job
+    return page, selection, store.encode(stats.run_page(page, _inputs, selection))
+
+
+def jobs(df):
+    """Every (page, selection) the sidebar selectboxes can produce."""
+    years = [int(y) for y in df['start_date'].dt.year.unique()]
+    teams = list(df['batting_team'].unique())
+    players = sorted(df['striker'].unique())
+    return ([('year_wise', (y,)) for y in years]
+            + [('all_time', ())]
+            + [('team_wise', (t,)) for t in teams]
+            + [('team_wise_opponent', (t, o)) for t in teams for o in teams]
+            + [('player_wise', (p,)) for p in players])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('data_path', nargs='?', default=data.DATA_PATH)
+    parser.add_argument('--cache-dir', default=data.CACHE_DIR)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    # Build the parquet cache once up front so workers only read it
+    df = data.load_deliveries(args.data_path, args.cache_dir)
+    version = data.content_version(args.data_path, args.cache_dir)
+    todo = jobs(df)
+    del df
+
+    with ProcessPoolExecutor(args.workers, initializer=_init_worker,
+                             initargs=(args.data_path, args.cache_dir)) as pool:
+        entries = list(pool.map(_run, todo, chunksize=16))
+
+    path = store.store_path(version, args.cache_dir)
+    store.write_store(path, entries)
+    size = os.path.getsize(path)
+    print(f"{len(entries)} payloads for version {version} -> {path} "
+          f"({size / 1e6:.1f} MB, {time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == '__main__':
+    main()
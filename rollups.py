@@ -0,0 +1,134 @@
+"""Per-player batting rollups: innings, season totals, top scores, careers and recent form.
+
+Built once for every player from the deliveries: one grouped pass gives each player's innings,
+sorted by player and date, and everything else comes from those rows (season totals by a second
+groupby over ~15k innings, last-N-innings form from cumulative sums). Each player's rows are one
+contiguous slice located by `indexes.group_offsets`, so a lookup costs the same for every player.
+"""
+import numpy as np
+import pandas as pd
+
+import indexes
+import kernels
+
+# Innings in the rolling form window, and how many top scores are kept per player
+FORM_WINDOW = 10
+TOP_SCORES = 10
+
+COUNTS = ['runs', 'balls', 'wides', 'outs', 'fours', 'sixes']
+
+
+def _rolling_sum(values, group_starts, window):
+    # Sum of each row and up to `window - 1` rows before it, without crossing into the previous group
+    totals = np.r_[0, np.cumsum(values)]
+    positions = np.arange(len(values))
+    first = np.maximum(positions - window + 1, group_starts)
+    return totals[positions + 1] - totals[first]
+
+
+def batting_innings(df):
+    """One row per (player, match) batted or dismissed in: runs, balls (wides excluded), wides, outs,
+    fours, sixes, with the match's start_date, season, date and venue; sorted by player, then date."""
+    keys = ['striker', 'match_id', 'batting_team', 'bowling_team']
+    batting = kernels.batting_counts(df, keys)
+    batting['balls'] -= batting['wides']
+    # Outs are the player's own dismissals, including run outs at the non-striker's end
+    dismissed = df[kernels.indicator(df, 'is_dismissal')]
+    outs = dismissed.groupby(['player_dismissed'] + keys[1:], observed=True).size().rename('outs').reset_index()
+    outs = outs.rename(columns={'player_dismissed': 'striker'})
+    innings = batting.merge(outs, on=keys, how='outer')
+    innings[COUNTS] = innings[COUNTS].fillna(0).astype('int64')
+
+    matches = df.drop_duplicates('match_id').set_index('match_id')[['start_date', 'date', 'venue']]
+    innings = innings.join(matches, on='match_id')
+    innings['season'] = innings['start_date'].dt.year
+    innings['batted'] = (innings['balls'] + innings['wides']) > 0
+    columns = ['striker', 'match_id', 'start_date', 'season', 'date', 'venue', 'batting_team', 'bowling_team',
+               'batted'] + COUNTS
+    return innings.sort_values(['striker', 'start_date', 'match_id'], kind='stable')[columns].reset_index(drop=True)
+
+
+class PlayerRollup:
+    """Batting rollups for every player in a deliveries frame; lookups are slices by player."""
+
+    def __init__(self, df, window=FORM_WINDOW):
+        self.window = window
+        self.players = df['striker'].cat.categories
+        size = len(self.players)
+
+        innings = batting_innings(df)
+        codes = innings['striker'].cat.codes.to_numpy()
+        self._innings_offsets = indexes.group_offsets(codes, size)
+        group_starts = self._innings_offsets[codes]
+        # Form over each player's last `window` innings up to and including this one
+        innings['form_innings'] = _rolling_sum(innings['batted'].to_numpy(dtype=np.int64), group_starts, window)
+        for col in ['runs', 'balls', 'wides', 'outs']:
+            innings[f'form_{col}'] = _rolling_sum(innings[col].to_numpy(), group_starts, window)
+        self.innings = innings
+
+        # A row per (player, season, team), in season order
+        self.seasons = innings.groupby(['striker', 'season', 'batting_team'], observed=True).agg(
+            innings=('batted', 'sum'),
+            **{col: (col, 'sum') for col in COUNTS},
+            best=('runs', 'max'),
+        ).reset_index()
+        self._season_offsets = indexes.group_offsets(self.seasons['striker'].cat.codes.to_numpy(), size)
+
+        # Highest innings first; ties in date order
+        top = innings.sort_values(['striker', 'runs', 'start_date', 'match_id'],
+                                  ascending=[True, False, True, True], kind='stable')
+        self.top = top.groupby('striker', observed=True).head(TOP_SCORES).reset_index(drop=True)
+        self._top_offsets = indexes.group_offsets(self.top['striker'].cat.codes.to_numpy(), size)
+
+        # A row per player in category order (zeros for players who never batted), with form as of their last innings
+        careers = self.seasons.groupby('striker', observed=False).agg(
+            innings=('innings', 'sum'),
+            **{col: (col, 'sum') for col in COUNTS},
+            best=('best', 'max'),
+        )
+        careers['best'] = careers['best'].fillna(0).astype('int64')
+        counts = np.diff(self._innings_offsets)
+        latest = innings.iloc[self._innings_offsets[1:][counts > 0] - 1]
+        form = ['form_innings', 'form_runs', 'form_balls', 'form_wides', 'form_outs']
+        careers[form] = 0
+        careers.loc[latest['striker'].to_numpy(), form] = latest[form].to_numpy()
+        self.careers = careers
+
+    def _code(self, player):
+        return self.players.get_indexer([player])[0]
+
+    def _slice(self, frame, offsets, player):
+        code = self._code(player)
+        if code < 0:
+            return frame.iloc[:0]
+        return frame.iloc[offsets[code]:offsets[code + 1]]
+
+    def innings_of(self, player):
+        """`player`'s innings in date order, with their rolling `form_*` columns."""
+        return self._slice(self.innings, self._innings_offsets, player)
+
+    def seasons_of(self, player):
+        """`player`'s season totals: innings, runs, balls, wides, outs, fours, sixes, best."""
+        return self._slice(self.seasons, self._season_offsets, player)
+
+    def top_scores(self, player):
+        """`player`'s TOP_SCORES highest innings, highest first."""
+        return self._slice(self.top, self._top_offsets, player)
+
+    def career(self, player):
+        """`player`'s career totals and current form as a Series (all zeros for an unknown player)."""
+        code = self._code(player)
+        if code < 0:
+            return pd.Series(0, index=self.careers.columns)
+        return self.careers.iloc[code]
+
+    def leaderboard(self, column, n=10, season=None, min_innings=1):
+        """The `n` players with the highest `column`, over their careers or in one `season`."""
+        frame = self.careers if season is None else self.seasons[self.seasons['season'] == season].set_index('striker')
+        return frame[frame['innings'] >= min_innings].nlargest(n, column)
+
+    @property
+    def nbytes(self):
+        frames = [self.innings, self.seasons, self.top, self.careers]
+        offsets = [self._innings_offsets, self._season_offsets, self._top_offsets]
+        return sum(frame.memory_usage(deep=True).sum() for frame in frames) + sum(o.nbytes for o in offsets)
@@ -0,0 +1,453 @@
+"""The numbers behind every page, as plain pandas/Python values with no Streamlit involved.
+
+Each function takes the deliveries frame (`data.prepare_deliveries`) and/or the derived tables
+(`data.load_tables`) and returns a dict; the page modules only render what comes back.
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import aggregates
+import instrument
+import kernels
+import rollups
+
+
+def season_key_stats(tables):
+    """Headline numbers for one season from its (year-filtered) derived tables."""
+    batter_innings = tables['batter_innings']
+    striker_runs = batter_innings.groupby(['batting_team', 'striker'], observed=True).agg(
+        total_runs=('runs', 'sum'),
+        fours=('fours', 'sum'),
+        sixes=('sixes', 'sum'),
+        num_times_striker=('balls', 'sum')
+    ).reset_index()
+    max_runs_player = striker_runs.loc[striker_runs['total_runs'].idxmax()]
+    max_score_player = batter_innings.loc[batter_innings['runs'].idxmax()]
+    bowler_wickets = tables['bowler_innings'].groupby(['bowling_team', 'bowler'], observed=True)['wickets'].sum().reset_index()
+    bowler_wickets = bowler_wickets[bowler_wickets['wickets'] > 0]
+    bowler_wickets.columns = ['Bowling Team', 'Bowler', 'Wickets']
+    max_wickets_bowler = bowler_wickets.loc[bowler_wickets['Wickets'].idxmax()]
+
+    # Get winner and runner-up teams
+    final_match = season_finals(tables['matches']).iloc[-1]
+    winner_team = final_match['winner']
+    if winner_team == final_match['team1']:
+        runner_up_team = final_match['team2']
+    else:
+        runner_up_team = final_match['team1']
+    if final_match["win_by_wickets"] == 0:
+        won = f'{final_match["win_by_runs"]} Runs '
+    else:
+        won = f'{final_match["win_by_wickets"]} Wickets '
+
+    return {
+        'num_matches': len(tables['matches']),
+        'tournament_fours': batter_innings['fours'].sum(),
+        'tournament_sixes': batter_innings['sixes'].sum(),
+        'tournament_total_runs': batter_innings['runs'].sum(),
+        'tournament_wickets': bowler_wickets['Wickets'].sum(),
+        'max_score_player': max_score_player['striker'],
+        'max_score': max_score_player['runs'],
+        'max_runs_player': max_runs_player['striker'],
+        'max_runs': max_runs_player['total_runs'],
+        'max_wickets_bowler': max_wickets_bowler['Bowler'],
+        'max_wickets': max_wickets_bowler['Wickets'],
+        'won_by': won,
+        'winner': winner_team,
+        'runner_up': runner_up_team,
+        'player_of_match': final_match['player_of_match'],
+    }
+
+
+def team_names(matches):
+    """Every team in order of first appearance in the matches table (newest match first), for pickers."""
+    # On the shared category codes, which is much cheaper than comparing strings
+    codes = np.column_stack([matches['team1'].cat.codes, matches['team2'].cat.codes]).ravel()
+    return list(matches['team1'].cat.categories[pd.unique(codes[codes >= 0])])
+
+
+def season_finals(matches):
+    """Each season's final (its last match by date; match_id breaks a same-day tie), oldest season first.
+
+    Chosen by date rather than row position, so it holds whatever order the matches are stored in.
+    """
+    latest = matches.sort_values(['start_date', 'match_id'], ascending=False, kind='stable')
+    return latest[~latest['start_date'].dt.year.duplicated()].iloc[::-1]
+
+
+def rank_innings(innings):
+    innings = innings.sort_values(by='total_runs', ascending=False)
+    innings['Rank'] = innings['total_runs'].rank(ascending=False, method='min')
+    # Move the 'start_date' column to the second position
+    start_date_col = innings.pop('start_date')
+    innings.insert(1, 'start_date', start_date_col)
+    return innings.set_index('Rank')  # Set 'Rank' column as index
+
+
+def top_n_with_others(frame, group, member, value, n):
+    """Keep the `n` largest `member`s of each `group` by `value`; sum the rest into one 'Others' row per group."""
+    frame = frame[[group, member, value]].astype({group: str, member: str})
+    rank = frame.groupby(group)[value].rank(method='first', ascending=False)
+    others = frame[rank > n].groupby(group, as_index=False)[value].sum()
+    others[member] = 'Others'
+    return pd.concat([frame[rank <= n], others[[group, member, value]]], ignore_index=True)
+
+
+def season_summary(df, tables, year):
+    """Everything the Year Wise page shows for `year`, as metrics and tables.
+
+    `df` may be every delivery or just that season's (e.g. `data.get_year_deliveries`).
+    """
+    with instrument.section('season filter', rows=len(df)) as entry:
+        filtered_data = df[df['start_date'].dt.year == year]
+        entry['rows'] = len(filtered_data)
+
+    # Total runs by team and striker
+    striker_runs = kernels.batting_counts(filtered_data, ['batting_team', 'striker']).rename(
+        columns={'runs': 'total_runs', 'balls': 'balls_faced'})
+    striker_runs['strike_rate'] = (striker_runs['total_runs'] / striker_runs['balls_faced']) * 100
+
+    # Top 10 players by runs scored
+    top_scorers = kernels.batting_counts(filtered_data, [filtered_data['start_date'].dt.year, 'striker']).rename(
+        columns={'runs': 'total_runs', 'balls': 'balls_faced', 'wides': 'num_wides', 'noballs': 'num_no_balls'}
+    )[['start_date', 'striker', 'total_runs', 'balls_faced', 'num_wides', 'num_no_balls', 'fours', 'sixes']]
+    top_scorers['balls_faced'] = top_scorers['balls_faced'] - top_scorers['num_wides'] - top_scorers['num_no_balls']
+    top_scorers['strike_rate'] = (top_scorers['total_runs'] / top_scorers['balls_faced']) * 100
+    top_scorers = top_scorers.sort_values(['start_date', 'total_runs'], ascending=[True, False])
+    top_scorers['Rank'] = top_scorers.groupby('start_date')['total_runs'].rank(method='dense', ascending=False)
+    top_scorers = top_scorers[top_scorers['Rank'] <= 10]
+    # Combined top scorers and stats
+    top_scorers_stats = filtered_data.groupby([filtered_data['start_date'].dt.year, 'player_dismissed'], observed=True).size().reset_index(name='num_times_out')
+    combined_data = pd.merge(top_scorers, top_scorers_stats, left_on='striker', right_on='player_dismissed', how='left')
+    combined_data['Batt. AVG'] = combined_data['total_runs'] / combined_data['num_times_out']
+    temp_combined = combined_data.drop(['start_date_x', 'start_date_y', 'player_dismissed', 'num_times_out', "num_wides", "num_no_balls"], axis=1)
+    temp_combined.set_index('Rank', inplace=True)  # Set 'Rank' column as index
+
+    # Total runs per match by team
+    total_runs_per_match_by_team = filtered_data.groupby(['start_date', 'batting_team'], observed=True)['total_runs'].sum().reset_index()
+
+    # Centuries with Bowling Team and Additional Metrics
+    centuries = kernels.batting_counts(filtered_data, [filtered_data['start_date'].dt.date, 'bowling_team', 'striker']).rename(
+        columns={'runs': 'total_runs', 'balls': 'balls_faced', 'wides': 'num_wides'}
+    )[['start_date', 'bowling_team', 'striker', 'total_runs', 'balls_faced', 'fours', 'sixes', 'num_wides']]
+    full_centuries = centuries[centuries.total_runs >= 100].copy()
+    half_centuries = centuries[(centuries.total_runs >= 50) & (centuries.total_runs <= 99)].copy()
+    if not full_centuries.empty:
+        full_centuries['balls_faced'] = centuries['balls_faced'] - centuries['num_wides']
+        full_centuries['strike_rate'] = (centuries['total_runs'] / centuries['balls_faced']) * 100
+        full_centuries = rank_innings(full_centuries)
+    if not half_centuries.empty:
+        half_centuries['balls_faced'] = half_centuries['balls_faced'] - half_centuries['num_wides']
+        half_centuries['strike_rate'] = (half_centuries['total_runs'] / half_centuries['balls_faced']) * 100
+        half_centuries = rank_innings(half_centuries)
+
+    # Wickets taken by bowler and bowling team
+    wickets = filtered_data[kernels.indicator(filtered_data, 'is_bowler_wicket')]
+    bowler_wickets = wickets.groupby(['bowling_team', 'bowler'], observed=True)['wicket_type'].count().reset_index()
+    bowler_wickets.columns = ['Bowling Team', 'Bowler', 'Wickets']
+
+    return {
+        'key_stats': season_key_stats(aggregates.for_year(tables, year)),
+        'striker_runs': striker_runs,
+        'top_scorers': temp_combined,
+        'runs_per_match': total_runs_per_match_by_team,
+        'centuries': full_centuries,
+        'half_centuries': half_centuries,
+        'runs_distribution': filtered_data.groupby('runs_off_bat').size().reset_index(name='count'),
+        'bowler_wickets': bowler_wickets,
+        'wickets_per_match': wickets.groupby(['start_date', 'bowling_team'], observed=True)['wicket_type'].count().reset_index(),
+    }
+
+
+def _best_rows(frame, column):
+    # Every row tied for the highest `column`: kept whole so merged partials still see all the ties
+    return frame[frame[column] == frame[column].max()] if len(frame) else frame
+
+
+def _first_best(frame, column, tiebreak):
+    # The record row: highest `column`, ties going to the earliest match, then the first name
+    frame = frame.sort_values(tiebreak, kind='stable')
+    return frame.iloc[frame[column].to_numpy().argmax()]
+
+
+def career_summary(tables):
+    """Mergeable partial aggregates behind the all-time records, for the matches in `tables`.
+
+    Summaries of disjoint sets of whole matches combine with `merge_summaries`, so the records can
+    be built chunk by chunk (see `streaming_all_time_records`) as well as from every match at once.
+    """
+    batter_innings = tables['batter_innings'].astype({'striker': str})
+    batters = batter_innings.groupby('striker').agg(
+        total_runs=('runs', 'sum'),
+        balls_faced=('balls', 'sum'),
+        wides_faced=('wides', 'sum'),
+        num_matches=('match_id', 'nunique'),
+        num_outs=('dismissals', 'sum'),
+        fours=('fours', 'sum'),
+        sixes=('sixes', 'sum'),
+    )
+    # Innings of 100 or more, counted per striker
+    batters['centuries'] = (batter_innings['runs'] > 99).groupby(batter_innings['striker']).sum()
+    bowler_innings = tables['bowler_innings'].astype({'bowler': str})
+    team_innings = tables['team_innings'][['match_id', 'batting_team', 'bowling_team', 'runs_off_bat', 'extras']]
+    team_innings = team_innings.astype({'batting_team': str, 'bowling_team': str})
+    return {
+        'num_matches': len(tables['matches']),
+        'batters': batters,
+        'bowlers': bowler_innings.groupby('bowler')[['wickets']].sum(),
+        'top_scores': _best_rows(batter_innings[['match_id', 'striker', 'runs']], 'runs'),
+        'top_sixes': _best_rows(batter_innings[['match_id', 'striker', 'sixes']], 'sixes'),
+        'top_team_scores': _best_rows(team_innings, 'runs_off_bat'),
+    }
+
+
+def merge_summaries(summaries):
+    """Combine `career_summary` results for disjoint sets of matches into one."""
+    summaries = list(summaries)
+    return {
+        'num_matches': sum(summary['num_matches'] for summary in summaries),
+        'batters': pd.concat([summary['batters'] for summary in summaries]).groupby(level=0).sum(),
+        'bowlers': pd.concat([summary['bowlers'] for summary in summaries]).groupby(level=0).sum(),
+        'top_scores': _best_rows(pd.concat([summary['top_scores'] for summary in summaries]), 'runs'),
+        'top_sixes': _best_rows(pd.concat([summary['top_sixes'] for summary in summaries]), 'sixes'),
+        'top_team_scores': _best_rows(pd.concat([summary['top_team_scores'] for summary in summaries]), 'runs_off_bat'),
+    }
+
+
+def records_from_summary(summary):
+    """The all-time records dict from a (possibly merged) `career_summary`."""
+    # Batters stats
+    batter_stats = summary['batters'].rename_axis('striker').reset_index()
+
+    # Calculate batting average
+    batter_stats['batting_avg'] = batter_stats['total_runs'] / (batter_stats['num_outs'] + 1e-9)  # Add 1e-9 to avoid division by zero
+    batter_stats.loc[batter_stats['batting_avg'] == np.inf, 'batting_avg'] = np.nan  # Replace infinite values with NaN
+
+    # Filter batters with at least 50 unique matches and more than 150 balls faced
+    filtered_batting_stats = batter_stats[(batter_stats['num_matches'] >= 50) & (batter_stats['balls_faced'] > 150)]
+
+    # Best Batters
+    max_runs_player = batter_stats.loc[batter_stats['total_runs'].idxmax()]
+    max_sr_player = filtered_batting_stats.loc[(filtered_batting_stats['total_runs'] / (filtered_batting_stats['balls_faced'] - filtered_batting_stats['wides_faced'])).idxmax()]
+    max_fours_player = batter_stats.loc[batter_stats['fours'].idxmax()]
+    max_sixes_player = batter_stats.loc[batter_stats['sixes'].idxmax()]
+    max_batting_avg_player = filtered_batting_stats.loc[filtered_batting_stats['batting_avg'].idxmax()]
+    most_centuries_player = batter_stats.loc[batter_stats['centuries'].idxmax()]
+
+    # Highest Individual Score and Most Sixes in a Single Match
+    max_score_player = _first_best(summary['top_scores'], 'runs', ['match_id', 'striker'])
+    max_sixes_in_match_player = _first_best(summary['top_sixes'], 'sixes', ['match_id', 'striker'])
+
+    # Best Bowlers
+    bowler_wickets = summary['bowlers'].rename_axis('bowler').reset_index()
+    bowler_wickets = bowler_wickets[bowler_wickets['wickets'] > 0]
+    max_wickets_bowler = bowler_wickets.loc[bowler_wickets['wickets'].idxmax()]
+
+    # Highest Team Score in a Single Match
+    highest_team_score = _first_best(summary['top_team_scores'], 'runs_off_bat', ['match_id', 'batting_team'])
+
+    return {
+        'num_matches': summary['num_matches'],
+        'max_runs_player': max_runs_player['striker'],
+        'max_runs': max_runs_player['total_runs'],
+        'max_runs_matches': max_runs_player['num_matches'],
+        'max_score_player': max_score_player['striker'],
+        'max_score': max_score_player['runs'],
+        'most_centuries_player': most_centuries_player['striker'],
+        'most_centuries': most_centuries_player['centuries'],
+        'max_wickets_bowler': max_wickets_bowler['bowler'],
+        'max_wickets': max_wickets_bowler['wickets'],
+        'tournament_wickets': bowler_wickets['wickets'].sum(),
+        'max_fours_player': max_fours_player['striker'],
+        'max_fours': max_fours_player['fours'],
+        'max_sixes_player': max_sixes_player['striker'],
+        'max_sixes': max_sixes_player['sixes'],
+        'max_sixes_in_match_player': max_sixes_in_match_player['striker'],
+        'max_sixes_in_match': max_sixes_in_match_player['sixes'],
+        'max_sr_player': max_sr_player['striker'],
+        'max_sr': max_sr_player['total_runs'] / (max_sr_player['balls_faced'] - max_sr_player['wides_faced']) * 100,
+        'max_batting_avg_player': max_batting_avg_player['striker'],
+        'max_batting_avg': max_batting_avg_player['batting_avg'],
+        'highest_team': highest_team_score['batting_team'],
+        'highest_team_score': highest_team_score['runs_off_bat'] + highest_team_score['extras'],
+        'highest_team_opponent': highest_team_score['bowling_team'],
+    }
+
+
+def all_time_records(tables):
+    """Career-best batters, bowlers and team scores over every season."""
+    return records_from_summary(career_summary(tables))
+
+
+def summarize_deliveries(df):
+    """`career_summary` straight from ball-by-ball rows that hold whole matches."""
+    return career_summary(aggregates.build_tables(df))
+
+
+def split_by_match(df, parts):
+    """`df` cut into `parts` frames by match_id, so no match is split between two of them."""
+    part = df['match_id'].to_numpy() % parts
+    return [df[part == i] for i in range(parts)]
+
+
+def _bounded_map(pool, fn, items, window):
+    # Like pool.map, but only `window` items are in flight, so a streamed input is never read far ahead
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def streaming_all_time_records(chunks, workers=None):
+    """`all_time_records` from an iterable of ball-by-ball frames holding whole matches
+    (e.g. `data.iter_match_chunks`), keeping only per-player totals and record rows in memory.
+
+    With `workers`, chunks are summarized in that many processes and merged as they come back.
+    """
+    if workers:
+        with ProcessPoolExecutor(workers) as pool:
+            return records_from_summary(_fold(_bounded_map(pool, summarize_deliveries, chunks, 2 * workers)))
+    return records_from_summary(_fold(summarize_deliveries(chunk) for chunk in chunks))
+
+
+def _fold(partials):
+    summary = None
+    for partial in partials:
+        summary = partial if summary is None else merge_summaries([summary, partial])
+    return summary
+
+
+def parallel_all_time_records(df, workers=None):
+    """`all_time_records` computed map/reduce style: `df` split by match across `workers` processes."""
+    workers = workers or os.cpu_count()
+    return streaming_all_time_records(split_by_match(df, workers), workers)
+
+
+def team_report(tables, selected_team, cube=None):
+    """Headline metrics, yearly scores and per-opponent results for one team.
+
+    With `cube` (a `headtohead.ResultCube`) the per-opponent results are read off it instead of grouped.
+    """
+    # Per-match results from the selected team's side: one row per match_id, so double-headers count twice
+    results = tables['team_results']
+    team_results = results[results['team'] == selected_team]
+    num_matches = len(team_results)
+
+    team_innings = tables['team_innings']
+    team_scores = team_innings[(team_innings['batting_team'] == selected_team) | (team_innings['bowling_team'] == selected_team)]
+    highest_team_score = team_scores.loc[team_scores['runs_off_bat'].idxmax()]
+
+    matches = tables['matches']
+    final_match_by_year = season_finals(matches)
+    cups_info = final_match_by_year[final_match_by_year["winner"] == selected_team][["start_date"]]
+    runnerup_years_info = final_match_by_year[(final_match_by_year["team1"] == selected_team) | (final_match_by_year["team2"] == selected_team)]
+    runnerup_years_info = runnerup_years_info[runnerup_years_info["winner"] != selected_team][["start_date"]]
+
+    yearly_runs = team_scores.groupby(team_scores['start_date'].dt.year)['runs_off_bat'].sum().reset_index()
+
+    batting_innings = team_innings[team_innings['batting_team'] == selected_team]
+    daily_scores = batting_innings.groupby('start_date')[['runs_off_bat', 'extras']].sum().reset_index()
+    daily_scores['total_score'] = daily_scores['runs_off_bat'] + daily_scores['extras']
+    max_scores_per_year = daily_scores.groupby(daily_scores['start_date'].dt.year).agg({'total_score': 'max'}).reset_index()
+
+    # Count occurrences where winner is equal to selected team
+    winner_counts = (team_results["result"] == "won").sum()
+    if cube is not None:
+        summary = cube.by_opponent(selected_team)
+    else:
+        summary = kernels.result_counts(team_results, 'opponent_team')
+
+    return {
+        'num_matches': num_matches,
+        'highest_score': highest_team_score['runs_off_bat'] + highest_team_score['extras'],
+        'highest_score_opponent': highest_team_score['bowling_team'],
+        'highest_score_date': highest_team_score['start_date'],
+        'years_won': list(cups_info["start_date"].dt.year),
+        'years_runnerup': list(runnerup_years_info["start_date"].dt.year),
+        'yearly_runs': yearly_runs,
+        'max_scores_per_year': max_scores_per_year,
+        'winning_percentage': (winner_counts / num_matches) * 100,
+        'summary': summary,
+    }
+
+
+def opponent_report(tables, selected_team, selected_opponent, cube=None):
+    """Results of `selected_team` against one opponent, city by city (a slice of `cube` when given)."""
+    if cube is not None:
+        return cube.by_city(selected_team, selected_opponent)
+    results = tables['team_results']
+    opponent_results = results[(results['team'] == selected_team) & (results["opponent_team"] == selected_opponent)]
+    return kernels.result_counts(opponent_results, 'city')
+
+
+def player_report(df, selected_player, rollup=None):
+    """Career metrics, top scores, yearly batting numbers and recent form for one player.
+
+    Read off `rollup` (a `rollups.PlayerRollup` over every player) when given; otherwise one is built
+    over just this player's deliveries.
+    """
+    if rollup is None:
+        # Filter data for selected player: balls faced, plus the balls they were out on at the other end
+        with instrument.section('player filter') as entry:
+            player_data = df[(df['striker'] == selected_player) | (df['player_dismissed'] == selected_player)]
+            entry['rows'] = len(player_data)
+        rollup = rollups.PlayerRollup(player_data)
+
+    career = rollup.career(selected_player)
+    runs_scored = career['runs']
+    # Every delivery faced, wides included
+    balls_faced = career['balls'] + career['wides']
+    num_times_out = career['outs']
+
+    seasons = rollup.seasons_of(selected_player)
+    yearly = seasons.groupby('season')[['runs', 'balls', 'wides', 'outs']].sum().reset_index()
+    top_scores = rollup.top_scores(selected_player)
+    form_balls = career['form_balls'] + career['form_wides']
+
+    return {
+        'num_matches': career['innings'],
+        'runs_scored': runs_scored,
+        'balls_faced': balls_faced,
+        'num_times_out': num_times_out,
+        'batting_avg': runs_scored / num_times_out if num_times_out > 0 else None,
+        'strike_rate': round((runs_scored / balls_faced) * 100, 2) if balls_faced > 0 else None,
+        'best_innings': career['best'],
+        'top_scores': top_scores[['start_date', 'venue', 'date', 'batting_team', 'bowling_team', 'runs']]
+                      .rename(columns={'runs': 'runs_off_bat'}).reset_index(drop=True),
+        'yearly_runs': seasons[['season', 'batting_team', 'runs']]
+                       .rename(columns={'season': 'start_date', 'runs': 'runs_off_bat'}).reset_index(drop=True),
+        'strike_rate_data': pd.DataFrame({'start_date': yearly['season'],
+                                          'strike_rate': yearly['runs'] / (yearly['balls'] + yearly['wides']) * 100}),
+        'batting_avg_data': pd.DataFrame({'start_date': yearly['season'],
+                                          'batting_avg': yearly['runs'] / yearly['outs'].where(yearly['outs'] > 0)}),
+        'form': {
+            'innings': career['form_innings'],
+            'runs': career['form_runs'],
+            'average': career['form_runs'] / career['form_outs'] if career['form_outs'] > 0 else None,
+            'strike_rate': round(career['form_runs'] / form_balls * 100, 2) if form_balls > 0 else None,
+        },
+    }
+
+
+# Page name (as passed to `cache.memoize`) -> (function, leading data inputs, keyword data inputs).
+# Inputs are named as in `data.load_inputs`; the page's selection follows the leading inputs.
+PAGES = {
+    'year_wise': (season_summary, ['df', 'tables'], {}),
+    'all_time': (all_time_records, ['tables'], {}),
+    'team_wise': (team_report, ['tables'], {'cube': 'cube'}),
+    'team_wise_opponent': (opponent_report, ['tables'], {'cube': 'cube'}),
+    'player_wise': (player_report, ['df'], {'rollup': 'rollup'}),
+}
+
+
+def run_page(page, inputs, selection):
+    """Compute `page` for `selection` (e.g. `[2023]` or `[team, opponent]`) from `data.load_inputs`."""
+    fn, args, kwargs = PAGES[page]
+    return fn(*[inputs[name] for name in args], *selection, **{key: inputs[name] for key, name in kwargs.items()})
@@ -0,0 +1,63 @@
+import os
+import pickle
+import sqlite3
+import zlib
+
+import data
+
+# Bump when a `stats` page result changes shape or meaning, so payloads stored by older code are never served
+# 2: player_wise reports best_innings and form instead of max_runs_single_day
+# 3: player_wise batting_avg and strike_rate are None, not a display string, when undefined
+PAYLOAD_VERSION = 3
+
+
+def store_path(version, cache_dir=data.CACHE_DIR):
+    """Where the precomputed payloads for dataset `version` live (one file per payload version)."""
+    return os.path.join(cache_dir, f'payloads-{PAYLOAD_VERSION}-{version}.sqlite')
+
+
+def selection_key(selection):
+    # Normalise numpy scalars (e.g. years from `.dt.year.unique()`) so keys match across processes
+    return repr(tuple(value.item() if hasattr(value, 'item') else value for value in selection))
+
+
+def encode(payload):
+    return zlib.compress(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def decode(blob):
+    return pickle.loads(zlib.decompress(blob))
+
+
+class PayloadStore:
+    """Read side of a precomputed payload file: (page, selection) -> compressed pickled result."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def get(self, page, selection):
+        """The stored payload, or None if the file or the entry doesn't exist."""
+        if not os.path.exists(self.path):
+            return None
+        # `with` on a connection only ends the transaction; close it explicitly
+        conn = sqlite3.connect(f'file:{self.path}?mode=ro', uri=True)
+        try:
+            row = conn.execute('SELECT payload FROM payloads WHERE page = ? AND selection = ?',
+                               (page, selection_key(selection))).fetchone()
+        finally:
+            conn.close()
+        return decode(row[0]) if row else None
+
+
+def write_store(path, entries):
+    """Write (page, selection, encoded payload) entries to a new store file, replacing any old one."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    with sqlite3.connect(tmp_path) as conn:
+        conn.execute('CREATE TABLE payloads (page TEXT, selection TEXT, payload BLOB, PRIMARY KEY (page, selection))')
+        conn.executemany('INSERT OR REPLACE INTO payloads VALUES (?, ?, ?)',
+                         ((page, selection_key(selection), blob) for page, selection, blob in entries))
+    conn.close()
+    os.replace(tmp_path, path)
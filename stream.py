@@ -0,0 +1,30 @@
+"""Computes the all-time records by streaming the CSV in chunks, for data too large to load at once.
+
+    python stream.py [path/to/new2.csv] [--chunksize N] [--workers N]
+
+Only per-player totals, the record innings and one chunk of deliveries (per worker) are held in memory.
+With --workers, chunks are summarized in a process pool while the next ones are read.
+"""
+import argparse
+import time
+
+import data
+import stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('data_path', nargs='?', default=data.DATA_PATH)
+    parser.add_argument('--chunksize', type=int, default=data.CHUNK_ROWS, help="CSV rows per read")
+    parser.add_argument('--workers', type=int, help="summarize chunks in this many processes")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    records = stats.streaming_all_time_records(data.iter_match_chunks(args.data_path, args.chunksize), args.workers)
+    for name, value in records.items():
+        print(f"{name:<28}{value}")
+    print(f"\n{time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""Writes a synthetic ball-by-ball CSV in the `new2.csv` schema, for benchmarks.
+
+    python synthetic.py out.csv [--scale N] [--seed S]
+
+One row per delivery, newest match first. Each unit of `scale` is another 16-season league
+(2008-23) with its own teams, players and venues, so 10x and 100x mimic multi-league volumes.
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+FIRST_SEASON = 2008
+NUM_SEASONS = 16
+TEAMS_PER_LEAGUE = 10
+SQUAD_SIZE = 18
+MATCHES_PER_SEASON = 60
+WICKET_TYPES = ['caught', 'bowled', 'lbw', 'run out', 'stumped', 'caught and bowled']
+WICKET_P = [0.6, 0.17, 0.1, 0.08, 0.03, 0.02]
+RUNS = [0, 1, 2, 3, 4, 6]
+RUNS_P = [0.38, 0.37, 0.07, 0.005, 0.115, 0.06]
+
+
+def _league(league, rng, first_match_id):
+    prefix = '' if league == 0 else f'L{league} '
+    teams = np.array([f'{prefix}Team {chr(65 + t)}' for t in range(TEAMS_PER_LEAGUE)])
+    squads = np.array([[f'{prefix}{chr(65 + t)} Player {p}' for p in range(SQUAD_SIZE)] for t in range(TEAMS_PER_LEAGUE)])
+    cities = np.array([f'{prefix}City {chr(65 + t)}' for t in range(TEAMS_PER_LEAGUE)])
+    venues = np.array([f'{prefix}Stadium {chr(65 + t)}' for t in range(TEAMS_PER_LEAGUE)])
+
+    # One row per match
+    n_matches = NUM_SEASONS * MATCHES_PER_SEASON
+    season = np.repeat(np.arange(FIRST_SEASON, FIRST_SEASON + NUM_SEASONS), MATCHES_PER_SEASON)
+    day = np.tile(np.sort(rng.integers(0, 55, MATCHES_PER_SEASON)), NUM_SEASONS)
+    day[MATCHES_PER_SEASON - 1::MATCHES_PER_SEASON] = 56  # the final is always the last match
+    dates = pd.to_datetime(season.astype(str) + '-04-01') + pd.to_timedelta(day, unit='D')
+    team1 = rng.integers(0, TEAMS_PER_LEAGUE, n_matches)
+    team2 = (team1 + rng.integers(1, TEAMS_PER_LEAGUE, n_matches)) % TEAMS_PER_LEAGUE
+    toss_team1 = rng.random(n_matches) < 0.5
+    bat_first = np.where(rng.random(n_matches) < 0.5, team1, team2)
+    bowl_first = np.where(bat_first == team1, team2, team1)
+    home = np.where(rng.random(n_matches) < 0.5, team1, team2)
+
+    # Deliveries: two innings per match, 120 legal balls plus extras each
+    n_innings = n_matches * 2
+    n_extras = rng.poisson(7, n_innings)
+    balls_per_innings = 120 + n_extras
+    inn_match = np.repeat(np.arange(n_matches), 2)
+    inn_no = np.tile([1, 2], n_matches)
+    row_innings = np.repeat(np.arange(n_innings), balls_per_innings)
+    n = len(row_innings)
+    starts = np.repeat(np.cumsum(balls_per_innings) - balls_per_innings, balls_per_innings)
+    ball_idx = np.arange(n) - starts
+    m = inn_match[row_innings]
+    batting = np.where(inn_no[row_innings] == 1, bat_first[m], bowl_first[m])
+    bowling = np.where(inn_no[row_innings] == 1, bowl_first[m], bat_first[m])
+
+    extra_kind = rng.random(n)
+    wides = np.where(extra_kind < 0.03, 1.0, np.nan)
+    noballs = np.where((extra_kind >= 0.03) & (extra_kind < 0.035), 1.0, np.nan)
+    byes = np.where((extra_kind >= 0.035) & (extra_kind < 0.04), 1.0, np.nan)
+    legbyes = np.where((extra_kind >= 0.04) & (extra_kind < 0.055), 1.0, np.nan)
+    extras = np.nan_to_num(wides) + np.nan_to_num(noballs) + np.nan_to_num(byes) + np.nan_to_num(legbyes)
+    runs_off_bat = rng.choice(RUNS, n, p=RUNS_P)
+    runs_off_bat[~np.isnan(wides)] = 0
+
+    wicket = (rng.random(n) < 0.05) & np.isnan(wides)
+    wickets_before = np.cumsum(wicket) - wicket
+    wickets_before -= np.repeat(wickets_before[np.cumsum(balls_per_innings) - balls_per_innings], balls_per_innings)
+    wicket &= wickets_before < 10
+    position = np.minimum(wickets_before + rng.integers(0, 2, n), SQUAD_SIZE - 1)
+    other = np.minimum(wickets_before + 1 - (position - wickets_before), SQUAD_SIZE - 1)
+    striker = squads[batting, position]
+    non_striker = squads[batting, other]
+    bowler = squads[bowling, SQUAD_SIZE - 1 - (ball_idx // 6 + row_innings) % 6]
+    wicket_type = np.where(wicket, rng.choice(WICKET_TYPES, n, p=WICKET_P), None)
+    player_dismissed = np.where(wicket, striker, None)
+
+    # Result: whoever scored more, with a sprinkling of no-results
+    inn_runs = np.bincount(row_innings, weights=runs_off_bat + extras, minlength=n_innings)
+    first, second = inn_runs[0::2], inn_runs[1::2]
+    winner_idx = np.where(first >= second, bat_first, bowl_first)
+    winner = teams[winner_idx].astype(object)
+    no_result = rng.random(n_matches) < 0.015
+    winner[no_result] = 'Draw'
+    win_by_runs = np.where((first >= second) & ~no_result, first - second, 0).astype(int)
+    win_by_wickets = np.where((first < second) & ~no_result, rng.integers(1, 10, n_matches), 0)
+
+    match_ids = first_match_id + np.arange(n_matches)
+    date_str = dates.strftime('%d-%m-%Y').to_numpy()
+    frame = pd.DataFrame({
+        'match_id': match_ids[m],
+        'innings': inn_no[row_innings],
+        'batting_team': teams[batting],
+        'bowling_team': teams[bowling],
+        'striker': striker,
+        'non_striker': non_striker,
+        'bowler': bowler,
+        'runs_off_bat': runs_off_bat,
+        'extras': extras.astype(int),
+        'wides': wides,
+        'noballs': noballs,
+        'byes': byes,
+        'legbyes': legbyes,
+        'wicket_type': wicket_type,
+        'player_dismissed': player_dismissed,
+        'season': season[m].astype(str),
+        'city': cities[home][m],
+        'date': date_str[m],
+        'team1': teams[team1][m],
+        'team2': teams[team2][m],
+        'toss_winner': np.where(toss_team1, teams[team1], teams[team2])[m],
+        'toss_decision': np.where(toss_team1 == (bat_first == team1), 'bat', 'field')[m],
+        'dl_applied': 0,
+        'winner': winner[m],
+        'win_by_runs': win_by_runs[m],
+        'win_by_wickets': win_by_wickets[m],
+        'player_of_match': squads[winner_idx, 0][m],
+        'venue': venues[home][m],
+        'runs': runs_off_bat + extras.astype(int),
+        'over': ball_idx // 6,
+        'ball_num': ball_idx % 6 + 1,
+    })
+    return frame
+
+
+def generate(scale=1, seed=0):
+    """Return `scale` leagues of synthetic deliveries, newest match first."""
+    rng = np.random.default_rng(seed)
+    frames = [_league(league, rng, 100000 + league * 10000) for league in range(scale)]
+    df = pd.concat(frames, ignore_index=True)
+    order = np.argsort(-df['match_id'].to_numpy(), kind='stable')
+    return df.iloc[order].reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('output', help="CSV path to write")
+    parser.add_argument('--scale', type=int, default=1, help="number of 16-season leagues")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    generate(args.scale, args.seed).to_csv(args.output, index=False)
+
+
+if __name__ == '__main__':
+    main()
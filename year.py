@@ -0,0 +1,127 @@
+import streamlit as st
+import plotly.express as px
+import cache
+import data
+import instrument
+import stats
+
+# Choices for how many players each team keeps in the stacked charts before the rest become 'Others'
+TOP_N_OPTIONS = [3, 5, 10, 'All']
+
+
+@cache.memoize('year_wise')
+def year_wise_report(_df, _tables, version, year):
+    """`stats.season_summary`, cached per dataset version and year."""
+    return stats.season_summary(_df, _tables, year)
+
+
+def stacked(frame, group, member, value, top_n):
+    """`frame` for a stacked bar: every member, or the top `top_n` per group plus 'Others' (one trace each)."""
+    if top_n == 'All':
+        return frame
+    return stats.top_n_with_others(frame, group, member, value, top_n)
+
+
+def display(tables):
+    """Display the season dashboard"""
+    version = data.dataset_version()
+
+    st.title("🏏 IPL Guru - Your Ultimate Cricket Companion 🏆")
+    # Years from the per-match table: same newest-first order as the deliveries, far fewer rows
+    selected_year = st.sidebar.selectbox("Select a Year", tables['matches']['start_date'].dt.year.unique(), key="year_selection")
+    # Only this season's rows: a slice of its partition rather than a scan of every delivery
+    with instrument.section('year deliveries') as entry:
+        year_data = data.get_year_deliveries(selected_year)
+        entry['rows'] = len(year_data)
+    with instrument.section('year_wise report', rows=len(year_data)):
+        report = year_wise_report(year_data, tables, version, selected_year)
+
+    # Display key stats
+    key_stats = report['key_stats']
+    st.subheader(f"🏆 Key Stats ({selected_year})")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Number of Matches", key_stats['num_matches'])
+        st.metric("Tournament Fours", key_stats['tournament_fours'])
+        st.metric("Tournament Sixes", key_stats['tournament_sixes'])
+        st.metric("Tournament Total Runs", key_stats['tournament_total_runs'])
+        st.metric("Tournament Total Wickets", key_stats['tournament_wickets'])
+    with col2:
+        st.metric("Highest Individual Score", key_stats['max_score_player'], f"{key_stats['max_score']} runs")
+        st.metric("Orange Cap Holder", key_stats['max_runs_player'], f"{key_stats['max_runs']} runs")
+        st.metric("Purple Cap Holder", key_stats['max_wickets_bowler'], f"{key_stats['max_wickets']} wickets")
+    with col3:
+        st.metric("(Finals) Won By", key_stats['won_by'])
+        st.metric("Winner", key_stats['winner'])
+        st.metric("Runner-up", key_stats['runner_up'])
+        st.metric("Player of Match (Finals)", key_stats['player_of_match'])
+
+    # Charts and tables are built only for the open tab, so a rerun doesn't pay for all of them
+    st.subheader("🔥 Important Charts")
+    top_n = st.sidebar.selectbox("Players per team in stacked charts", TOP_N_OPTIONS, index=1, key="year_top_n")
+    runs_tab, scorers_tab, runs_match_tab, centuries_tab, distribution_tab, bowlers_tab, wickets_match_tab = st.tabs(
+        ["Runs by Team", "Top Scorers", "Runs per Match", "Centuries", "Runs Distribution", "Wickets by Bowler", "Wickets per Match"],
+        key="year_tab", on_change="rerun")
+
+    if runs_tab.open:
+        with runs_tab, instrument.section('runs by team tab'):
+            with instrument.section('figure') as entry:
+                striker_runs = stacked(report['striker_runs'], 'batting_team', 'striker', 'total_runs', top_n)
+                entry['rows'] = len(striker_runs)
+                fig_runs = px.bar(striker_runs, x='batting_team', y='total_runs', color='striker', title='Total Runs by Team and Striker', barmode='stack')
+                fig_runs.update_layout(xaxis_title='Batting Team', yaxis_title='Total Runs', legend_title='Striker')
+            with instrument.section('render'):
+                st.plotly_chart(fig_runs, use_container_width=True)
+
+    if scorers_tab.open:
+        with scorers_tab, instrument.section('top scorers tab', rows=len(report['top_scorers'])):
+            st.subheader("🏏 This Year Top Scorers and Stats")
+            st.write(report['top_scorers'])
+
+    if runs_match_tab.open:
+        with runs_match_tab, instrument.section('runs per match tab'):
+            # Create a line chart for total runs per match by team
+            with instrument.section('figure', rows=len(report['runs_per_match'])):
+                fig_runs_per_match = px.line(report['runs_per_match'], x='start_date', y='total_runs', color='batting_team', title='Total Runs per Match by Team')
+            with instrument.section('render'):
+                st.plotly_chart(fig_runs_per_match, use_container_width=True)
+
+    if centuries_tab.open:
+        with centuries_tab, instrument.section('centuries tab', rows=len(report['centuries']) + len(report['half_centuries'])):
+            if not report['centuries'].empty:
+                st.subheader(f"👏 Centuries ({selected_year})")
+                st.write(report['centuries'])
+            else:
+                st.write('No players scored more than 100 runs in a single match.')
+            if not report['half_centuries'].empty:
+                st.subheader(f"👏 Half -Centuries ({selected_year})")
+                st.write(report['half_centuries'])
+            else:
+                st.write('No players scored more than 50 runs in a single match.')
+
+    if distribution_tab.open:
+        with distribution_tab, instrument.section('runs distribution tab'):
+            # Runs distribution
+            with instrument.section('figure', rows=len(report['runs_distribution'])):
+                fig_runs_distribution = px.pie(report['runs_distribution'], values='count', names='runs_off_bat', title='Runs Distribution (Fours vs. Sixes)')
+            st.subheader(f"🔢 Runs Distribution ({selected_year})")
+            with instrument.section('render'):
+                st.plotly_chart(fig_runs_distribution, use_container_width=True)
+
+    if bowlers_tab.open:
+        with bowlers_tab, instrument.section('wickets by bowler tab'):
+            # Wickets taken by bowler and bowling team
+            with instrument.section('figure') as entry:
+                bowler_wickets = stacked(report['bowler_wickets'], 'Bowling Team', 'Bowler', 'Wickets', top_n)
+                entry['rows'] = len(bowler_wickets)
+                fig_bowlers = px.bar(bowler_wickets, x='Bowling Team', y='Wickets', color='Bowler', title='Wickets Taken by Bowler and Bowling Team', barmode='stack')
+            with instrument.section('render'):
+                st.plotly_chart(fig_bowlers, use_container_width=True)
+
+    if wickets_match_tab.open:
+        with wickets_match_tab, instrument.section('wickets per match tab'):
+            # Create a line chart for total wickets per match by team
+            with instrument.section('figure', rows=len(report['wickets_per_match'])):
+                fig_wickets_per_match = px.line(report['wickets_per_match'], x='start_date', y='wicket_type', color='bowling_team', title='Total Wickets per Match by Team')
+            with instrument.section('render'):
+                st.plotly_chart(fig_wickets_per_match, use_container_width=True)